@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.vectorstore.embeddings import aembed_query
+from app.utils.department_matcher import match_departments
+import numpy as np
+import os
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+
+# 문서가 존재하는 도메인의 답변만 캐시 (필터링/라우팅 실패 답변은 제외)
+CACHEABLE_DOMAINS = {"course", "curriculum", "department_intro", "employment_status"}
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！~]+$")
+_WHITESPACE = re.compile(r"\s+")
+_DEPARTMENT_UNIT = re.compile(r"[가-힣A-Za-z]+(?:학과|학부)")
+
+
+def normalize_question(question: str) -> str:
+    """공백/대소문자/끝 문장부호 차이를 무시하도록 질문을 정규화"""
+    normalized = _WHITESPACE.sub(" ", question.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", normalized)
+
+
+def department_key(question: str) -> Tuple[str, ...]:
+    """
+    질문이 가리키는 학과 (유사 질문 hit 허용 조건)
+    "소프트웨어학과 졸업요건" / "전자공학과 졸업요건"처럼 학과만 다른 질문은 임베딩이 거의 같으므로 따로 비교한다.
+    """
+    match = match_departments(question)
+    if match.departments:
+        return tuple(sorted(match.departments))
+    # ambiguous 등 학과를 확정하지 못한 경우 질문 속 "OO학과/학부" 표현 자체로 비교
+    return tuple(sorted({unit.lower() for unit in _DEPARTMENT_UNIT.findall(_WHITESPACE.sub("", question))}))
+
+
+class _Entry:
+    __slots__ = ("answer", "domain", "departments", "slot", "expires_at")
+
+    def __init__(self, answer: str, domain: str, departments: Tuple[str, ...], slot: Optional[int], expires_at: float):
+        self.answer = answer
+        self.domain = domain
+        self.departments = departments
+        self.slot = slot
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """
+    graph 실행 결과(최종 답변)를 질문 단위로 저장하는 캐시.
+    정규화된 질문의 완전 일치를 먼저 확인하고, 실패하면 임베딩 코사인 유사도로 유사 질문을 찾는다.
+    유사 질문은 질문이 가리키는 학과까지 같을 때만 hit로 인정한다.
+    TTL 만료 + LRU 방식으로 제거하며, 도메인 문서가 바뀌면 해당 도메인 항목만 무효화한다.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Awaitable[List[float]]],
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        similarity_threshold: float = CACHE_SIMILARITY_THRESHOLD,
+    ):
+        self._embed_fn = embed_fn
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 유사도 검색용 임베딩 행렬 (slot 단위로 재사용, 첫 임베딩 시 차원 확정)
+        self._vectors: Optional[np.ndarray] = None
+        self._slot_keys: List[Optional[str]] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        # 무효화 시점 기록: 무효화 이전에 시작된 graph 실행 결과가 다시 저장되는 것을 방지
+        self._version = 0
+        self._domain_versions: Dict[str, int] = {}
+
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    async def get(self, question: str) -> Optional[str]:
+        key = normalize_question(question)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._exact_hits += 1
+                    return entry.answer
+                self._remove(key)
+                self._expirations += 1
+            has_vectors = self._vectors is not None and len(self._entries) > 0
+
+        if not has_vectors:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        query_vector = await self._embed(question)
+        if query_vector is None:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        departments = department_key(question)
+        with self._lock:
+            if self._vectors is None or query_vector.shape[0] != self._vectors.shape[1]:
+                self._misses += 1
+                return None
+
+            scores = self._vectors @ query_vector
+            while True:
+                best_slot = int(np.argmax(scores))
+                best_score = float(scores[best_slot])
+                best_key = self._slot_keys[best_slot]
+                if best_key is None or best_score < self._similarity_threshold:
+                    self._misses += 1
+                    return None
+
+                entry = self._entries[best_key]
+                if entry.departments != departments:
+                    # 학과가 다른 질문의 답변은 재사용하지 않음
+                    scores[best_slot] = -1.0
+                    continue
+                if entry.expires_at > now:
+                    self._entries.move_to_end(best_key)
+                    self._semantic_hits += 1
+                    logger.info(f"[CACHE] semantic hit (score={best_score:.4f}): {best_key}")
+                    return entry.answer
+
+                self._remove(best_key)
+                self._expirations += 1
+                scores[best_slot] = -1.0
+
+    def version(self) -> int:
+        """graph 실행 직전에 받아두었다가 put에 전달하는 무효화 버전"""
+        with self._lock:
+            return self._version
+
+    async def put(self, question: str, answer: str, domain: str, version: Optional[int] = None) -> None:
+        key = normalize_question(question)
+        vector = await self._embed(question)
+        departments = department_key(question)
+
+        with self._lock:
+            if version is not None and self._domain_versions.get(domain, 0) > version:
+                logger.info(f"[CACHE] '{domain}' 도메인이 실행 중 무효화되어 저장 생략")
+                return
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self._max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+            slot = None
+            if vector is not None:
+                if self._vectors is None:
+                    self._vectors = np.zeros((self._max_entries, vector.shape[0]), dtype=np.float32)
+                if vector.shape[0] == self._vectors.shape[1]:
+                    slot = self._free_slots.pop()
+                    self._vectors[slot] = vector
+                    self._slot_keys[slot] = key
+
+            self._entries[key] = _Entry(answer, domain, departments, slot, time.monotonic() + self._ttl_seconds)
+
+    def invalidate_domain(self, domain: str) -> int:
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.domain == domain]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            self._version += 1
+            self._domain_versions[domain] = self._version
+
+        logger.info(f"[CACHE] '{domain}' 도메인 캐시 {len(keys)}건 무효화")
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits = self._exact_hits + self._semantic_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.slot is not None:
+            self._vectors[entry.slot] = 0.0
+            self._slot_keys[entry.slot] = None
+            self._free_slots.append(entry.slot)
+
+    async def _embed(self, question: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(await self._embed_fn(question), dtype=np.float32)
+        except Exception as e:
+            # 임베딩 실패 시 완전 일치 캐시로만 동작
+            logger.warning(f"[CACHE] 질문 임베딩 실패: {e}")
+            return None
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+
+# 벡터 검색과 같은 쿼리 임베딩 캐시를 공유하므로 캐시 miss 후 retrieve 단계에서 재임베딩하지 않음
+answer_cache = AnswerCache(embed_fn=aembed_query)
@@ -0,0 +1,433 @@
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from sqlalchemy import Column, Integer, LargeBinary, MetaData, String, Table, and_, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.utils.session_provider import SESSION_PROVIDER
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# bedrock: Bedrock 세션 / sql: 앱 DB(SQLite / PostgreSQL) / memory: 프로세스 메모리 (테스트용)
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory" if SESSION_PROVIDER == "local" else "bedrock").lower()
+# true면 한 턴의 중간 checkpoint는 메모리에만 두고, 턴이 끝난 뒤 최종 상태만 백그라운드로 저장
+CHECKPOINT_WRITE_BEHIND = os.getenv("CHECKPOINT_WRITE_BEHIND", "false").lower() == "true"
+
+_metadata = MetaData()
+
+checkpoints_table = Table(
+    "graph_checkpoints", _metadata,
+    Column("thread_id", String, primary_key=True),
+    Column("checkpoint_ns", String, primary_key=True),
+    Column("checkpoint_id", String, primary_key=True),
+    Column("parent_checkpoint_id", String, nullable=True),
+    Column("checkpoint_type", String, nullable=False),
+    Column("checkpoint", LargeBinary, nullable=False),
+    Column("metadata_type", String, nullable=False),
+    Column("metadata", LargeBinary, nullable=False),
+)
+
+writes_table = Table(
+    "graph_checkpoint_writes", _metadata,
+    Column("thread_id", String, primary_key=True),
+    Column("checkpoint_ns", String, primary_key=True),
+    Column("checkpoint_id", String, primary_key=True),
+    Column("task_id", String, primary_key=True),
+    Column("idx", Integer, primary_key=True),
+    Column("channel", String, nullable=False),
+    Column("value_type", String, nullable=False),
+    Column("value", LargeBinary, nullable=False),
+    Column("task_path", String, nullable=False, default=""),
+)
+
+
+def _checkpoint_config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+
+class SQLCheckpointSaver(BaseCheckpointSaver):
+    """
+    앱 DB(app.config.database의 async 엔진)에 checkpoint를 저장
+    channel 값까지 포함한 checkpoint 전체를 한 행에 직렬화해 두므로 조회는 행 하나 + pending writes로 끝난다.
+    """
+
+    def __init__(self, engine=None, **kwargs):
+        super().__init__(**kwargs)
+        if engine is None:
+            from app.config.database import engine
+        self._engine = engine
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+
+    async def _setup(self):
+        if self._ready:
+            return
+        async with self._ready_lock:
+            if not self._ready:
+                async with self._engine.begin() as conn:
+                    await conn.run_sync(_metadata.create_all)
+                self._ready = True
+
+    def _upsert(self, table: Table, values: Dict[str, Any], overwrite: bool = True):
+        dialect = self._engine.dialect.name
+        insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[dialect]
+        statement = insert(table).values(**values)
+        keys = [column.name for column in table.primary_key.columns]
+        if not overwrite:
+            return statement.on_conflict_do_nothing(index_elements=keys)
+        return statement.on_conflict_do_update(
+            index_elements=keys, set_={k: v for k, v in values.items() if k not in keys}
+        )
+
+    async def _pending_writes(self, conn, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        result = await conn.execute(
+            select(writes_table.c.task_id, writes_table.c.channel, writes_table.c.value_type, writes_table.c.value)
+            .where(and_(
+                writes_table.c.thread_id == thread_id,
+                writes_table.c.checkpoint_ns == checkpoint_ns,
+                writes_table.c.checkpoint_id == checkpoint_id,
+            ))
+            .order_by(writes_table.c.task_id, writes_table.c.idx)
+        )
+        return [(row.task_id, row.channel, self.serde.loads_typed((row.value_type, row.value))) for row in result]
+
+    async def _to_tuple(self, conn, row) -> CheckpointTuple:
+        return CheckpointTuple(
+            config=_checkpoint_config(row.thread_id, row.checkpoint_ns, row.checkpoint_id),
+            checkpoint=self.serde.loads_typed((row.checkpoint_type, row.checkpoint)),
+            metadata=self.serde.loads_typed((row.metadata_type, row.metadata)),
+            parent_config=(
+                _checkpoint_config(row.thread_id, row.checkpoint_ns, row.parent_checkpoint_id)
+                if row.parent_checkpoint_id else None
+            ),
+            pending_writes=await self._pending_writes(conn, row.thread_id, row.checkpoint_ns, row.checkpoint_id),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self._setup()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = select(checkpoints_table).where(and_(
+            checkpoints_table.c.thread_id == thread_id,
+            checkpoints_table.c.checkpoint_ns == checkpoint_ns,
+        ))
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        else:
+            # checkpoint id(uuid6)는 생성 순서대로 정렬됨
+            query = query.order_by(checkpoints_table.c.checkpoint_id.desc()).limit(1)
+        async with self._engine.connect() as conn:
+            row = (await conn.execute(query)).first()
+            return await self._to_tuple(conn, row) if row else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self._setup()
+        query = select(checkpoints_table).order_by(checkpoints_table.c.checkpoint_id.desc())
+        if config:
+            query = query.where(checkpoints_table.c.thread_id == config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(checkpoints_table.c.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(checkpoints_table.c.checkpoint_id < before_id)
+
+        async with self._engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+            for row in rows:
+                if limit is not None and limit <= 0:
+                    break
+                checkpoint_tuple = await self._to_tuple(conn, row)
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                if limit is not None:
+                    limit -= 1
+                yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await self._setup()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        async with self._engine.begin() as conn:
+            await conn.execute(self._upsert(checkpoints_table, {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "checkpoint_type": checkpoint_type,
+                "checkpoint": checkpoint_bytes,
+                "metadata_type": metadata_type,
+                "metadata": metadata_bytes,
+            }))
+        return _checkpoint_config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._setup()
+        configurable = config["configurable"]
+        async with self._engine.begin() as conn:
+            for idx, (channel, value) in enumerate(writes):
+                value_type, value_bytes = self.serde.dumps_typed(value)
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                await conn.execute(self._upsert(writes_table, {
+                    "thread_id": configurable["thread_id"],
+                    "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+                    "checkpoint_id": configurable["checkpoint_id"],
+                    "task_id": task_id,
+                    "idx": write_idx,
+                    "channel": channel,
+                    "value_type": value_type,
+                    "value": value_bytes,
+                    "task_path": task_path,
+                }, overwrite=write_idx < 0))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._setup()
+        async with self._engine.begin() as conn:
+            await conn.execute(delete(writes_table).where(writes_table.c.thread_id == thread_id))
+            await conn.execute(delete(checkpoints_table).where(checkpoints_table.c.thread_id == thread_id))
+
+    def get_next_version(self, current, channel):
+        return InMemorySaver.get_next_version(self, current, channel)
+
+
+class CheckpointRequestMetrics:
+    """한 번의 chat 요청(thread) 동안 발생한 checkpoint 저장 횟수 / 크기 / 직렬화 시간 / 원격 저장 시간"""
+
+    __slots__ = ("puts", "writes", "bytes", "serialize_seconds", "persisted_puts", "write_seconds")
+
+    def __init__(self):
+        self.puts = 0
+        self.writes = 0
+        self.bytes = 0
+        self.serialize_seconds = 0.0
+        self.persisted_puts = 0
+        self.write_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "puts": self.puts,
+            "writes": self.writes,
+            "bytes": self.bytes,
+            "serialize_ms": round(self.serialize_seconds * 1000, 2),
+            "persisted_puts": self.persisted_puts,
+            "write_ms": round(self.write_seconds * 1000, 2),
+        }
+
+
+class MeteredCheckpointer(BaseCheckpointSaver):
+    """
+    실제 저장소(backend) 앞에서 checkpoint 크기와 저장 지연을 요청(thread) 단위로 집계
+    write_behind=True면 한 턴 동안의 checkpoint는 메모리 버퍼에만 쓰고,
+    flush(thread_id) 때 root namespace의 마지막 checkpoint(와 그 pending writes)만 backend에 저장한다.
+    """
+
+    def __init__(self, backend: BaseCheckpointSaver, write_behind: bool = CHECKPOINT_WRITE_BEHIND):
+        super().__init__(serde=backend.serde)
+        self.backend = backend
+        self.write_behind = write_behind
+        self._buffer = InMemorySaver(serde=backend.serde)
+        # thread_id → 이번 턴이 이어받은(backend에 저장된) 마지막 checkpoint id
+        self._base_checkpoint: Dict[str, Optional[str]] = {}
+        self._flushing: Dict[str, asyncio.Task] = {}
+        self._requests: Dict[str, CheckpointRequestMetrics] = defaultdict(CheckpointRequestMetrics)
+        self._totals = CheckpointRequestMetrics()
+        self._flushes = 0
+        self._flush_seconds = 0.0
+        self._flush_errors = 0
+
+    def _record(self, thread_id: str, name: str, value: float = 1):
+        for metrics in (self._requests[thread_id], self._totals):
+            setattr(metrics, name, getattr(metrics, name) + value)
+
+    async def _timed(self, thread_id: str, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self._record(thread_id, "write_seconds", time.perf_counter() - start)
+            self._record(thread_id, "persisted_puts")
+
+    # --- 조회 ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        if self.write_behind:
+            # 직전 턴의 저장이 끝나기 전에 다음 턴이 시작되면 저장 완료를 기다림
+            pending = self._flushing.get(thread_id)
+            if pending is not None:
+                await asyncio.shield(pending)
+            buffered = await self._buffer.aget_tuple(config)
+            if buffered is not None:
+                return buffered
+        checkpoint_tuple = await self.backend.aget_tuple(config)
+        if self.write_behind and not config["configurable"].get("checkpoint_ns"):
+            self._base_checkpoint[thread_id] = checkpoint_tuple.config["configurable"]["checkpoint_id"] if checkpoint_tuple else None
+        return checkpoint_tuple
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self.backend.alist(config, **kwargs):
+            yield checkpoint_tuple
+
+    # --- 저장 ---
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        self._record(thread_id, "puts")
+        start = time.perf_counter()
+        size = len(self.serde.dumps_typed(checkpoint)[1])
+        self._record(thread_id, "serialize_seconds", time.perf_counter() - start)
+        self._record(thread_id, "bytes", size)
+        if self.write_behind:
+            return await self._buffer.aput(config, checkpoint, metadata, new_versions)
+        return await self._timed(thread_id, self.backend.aput(config, checkpoint, metadata, new_versions))
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._record(thread_id, "writes", len(writes))
+        if self.write_behind:
+            return await self._buffer.aput_writes(config, writes, task_id, task_path)
+        start = time.perf_counter()
+        try:
+            await self.backend.aput_writes(config, writes, task_id, task_path)
+        finally:
+            self._record(thread_id, "write_seconds", time.perf_counter() - start)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._buffer.adelete_thread(thread_id)
+        await self.backend.adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.backend.get_next_version(current, channel)
+
+    # --- write-behind ---
+
+    def flush(self, thread_id: str) -> Optional[asyncio.Task]:
+        """턴이 끝난 뒤 호출. 버퍼에 있는 최종 상태를 백그라운드로 backend에 저장"""
+        if not self.write_behind:
+            return None
+        previous = self._flushing.get(thread_id)
+        task = asyncio.create_task(self._flush(thread_id, previous))
+        self._flushing[thread_id] = task
+        task.add_done_callback(lambda done: self._flushing.pop(thread_id, None) if self._flushing.get(thread_id) is done else None)
+        return task
+
+    async def _flush(self, thread_id: str, previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        final = await self._buffer.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+        if final is None:
+            return
+        start = time.perf_counter()
+        try:
+            parent = {"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": "",
+                "checkpoint_id": self._base_checkpoint.get(thread_id),
+            }}
+            # 중간 checkpoint를 건너뛰므로 모든 channel 값을 새 버전으로 저장
+            saved = await self.backend.aput(parent, final.checkpoint, final.metadata, final.checkpoint["channel_versions"])
+            writes_by_task: Dict[str, List[Tuple[str, Any]]] = defaultdict(list)
+            for task_id, channel, value in final.pending_writes or []:
+                writes_by_task[task_id].append((channel, value))
+            for task_id, writes in writes_by_task.items():
+                await self.backend.aput_writes(saved, writes, task_id)
+            self._base_checkpoint[thread_id] = saved["configurable"]["checkpoint_id"]
+            await self._buffer.adelete_thread(thread_id)
+        except Exception as e:
+            # 실패하면 버퍼를 남겨 두어 같은 프로세스의 다음 턴은 이어서 진행됨
+            self._flush_errors += 1
+            logger.warning(f"[CHECKPOINT] write-behind flush failed (thread_id={thread_id}): {e}")
+            return
+        finally:
+            elapsed = time.perf_counter() - start
+            self._flushes += 1
+            self._flush_seconds += elapsed
+            self._totals.write_seconds += elapsed
+            self._totals.persisted_puts += 1
+        logger.info(f"[CHECKPOINT] flushed thread_id={thread_id} in {elapsed * 1000:.1f}ms")
+
+    async def aclose(self):
+        """종료 시 아직 저장 중인 턴을 기다림"""
+        await asyncio.gather(*list(self._flushing.values()), return_exceptions=True)
+
+    # --- 지표 ---
+
+    def pop_request_metrics(self, thread_id: str) -> Dict[str, float]:
+        """요청이 끝날 때 호출해 이번 요청의 집계를 꺼냄"""
+        return self._requests.pop(thread_id, CheckpointRequestMetrics()).as_dict()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "backend": type(self.backend).__name__,
+            "write_behind": self.write_behind,
+            **self._totals.as_dict(),
+            "buffered_threads": sum(1 for namespaces in self._buffer.storage.values() if any(namespaces.values())),
+            "flushes": self._flushes,
+            "flush_errors": self._flush_errors,
+            "flush_ms_avg": round(self._flush_seconds / self._flushes * 1000, 2) if self._flushes else 0.0,
+        }
+
+
+def create_checkpointer(name: str = CHECKPOINTER) -> MeteredCheckpointer:
+    if name == "bedrock":
+        from langgraph_checkpoint_aws.async_saver import AsyncBedrockSessionSaver
+        backend = AsyncBedrockSessionSaver(
+            region_name=os.getenv("AWS_REGION"),
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+        )
+    elif name == "sql":
+        backend = SQLCheckpointSaver()
+    elif name == "memory":
+        backend = InMemorySaver()
+    else:
+        raise ValueError(f"Unsupported CHECKPOINTER: {name}")
+    return MeteredCheckpointer(backend)
@@ -0,0 +1,96 @@
+from functools import wraps
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# 요청 1건이 자기 교정 루프(재생성 / 질문 재작성)에 쓸 수 있는 최대 시간 (질문 수신 시점부터)
+LOOP_DEADLINE_SECONDS = float(os.getenv("LOOP_DEADLINE_SECONDS", "30"))
+# 도메인 서브그래프 안에서 허용하는 generate 호출 수 (첫 생성 포함) / transform_query 호출 수
+LOOP_MAX_GENERATIONS = int(os.getenv("LOOP_MAX_GENERATIONS", "3"))
+LOOP_MAX_REWRITES = int(os.getenv("LOOP_MAX_REWRITES", "2"))
+
+LOOP_LIMITS = {"generate": LOOP_MAX_GENERATIONS, "transform_query": LOOP_MAX_REWRITES}
+
+# 답변 평가 결과 순위: 질문을 해결함 > 근거는 있으나 질문을 해결하지 못함 > 근거 없음(환각)
+GRADE_RANK = {"relevant": 2, "not relevant": 1, "hallucination": 0}
+# 예산이 끝났을 때 돌려줄 수 있는 최소 순위 (환각으로 판정된 답변은 반환하지 않음)
+MIN_RETURNABLE_RANK = GRADE_RANK["not relevant"]
+
+NOT_FOUND_MESSAGE = "관련된 정보를 찾을 수 없습니다. 다른 질문을 시도해보세요."
+
+# 답변 생성 LLM 호출에 붙이는 tag: /chat/stream은 이 tag가 붙은 호출의 토큰만 답변으로 내보냄 (평가 LLM 출력 제외)
+ANSWER_TAG = "answer"
+
+
+def new_deadline() -> float:
+    return time.time() + LOOP_DEADLINE_SECONDS
+
+
+def tracked(name: str, node: Callable[[Dict], Awaitable[Dict]]) -> Callable[[Dict], Awaitable[Dict]]:
+    """노드 호출 횟수와 소요 시간을 state의 loop 통계에 누적"""
+
+    @wraps(node)
+    async def run(state: Dict) -> Dict:
+        start = time.perf_counter()
+        update = await node(state)
+        elapsed = time.perf_counter() - start
+        loop = dict(state.get("loop") or {})
+        stats = loop.get(name) or {"calls": 0, "seconds": 0.0}
+        loop[name] = {"calls": stats["calls"] + 1, "seconds": round(stats["seconds"] + elapsed, 3)}
+        return {**update, "loop": loop}
+
+    return run
+
+
+def can_continue(state: Dict, name: str) -> bool:
+    """
+    name 노드(generate / transform_query)를 한 번 더 실행할 예산이 남았는지
+    남은 시간이 지금까지 해당 노드의 평균 소요 시간보다 짧으면 시작하지 않는다.
+    """
+    stats = (state.get("loop") or {}).get(name) or {"calls": 0, "seconds": 0.0}
+    if stats["calls"] >= LOOP_LIMITS[name]:
+        logger.info(f"[BUDGET] {name} limit reached ({stats['calls']}/{LOOP_LIMITS[name]})")
+        return False
+    deadline = state.get("deadline")
+    if deadline:
+        remaining = deadline - time.time()
+        expected = stats["seconds"] / stats["calls"] if stats["calls"] else 0.0
+        if remaining <= expected:
+            logger.info(f"[BUDGET] deadline reached (remaining {remaining:.1f}s, {name} takes ~{expected:.1f}s)")
+            return False
+    return True
+
+
+def record_candidate(state: Dict, grade: str) -> Dict:
+    """평가를 마친 답변이 지금까지의 최선이면 best_generation / best_grade로 보관"""
+    best_grade: Optional[str] = state.get("best_grade")
+    if best_grade is None or GRADE_RANK[grade] > GRADE_RANK[best_grade]:
+        return {"best_generation": state["generation"], "best_grade": grade}
+    return {}
+
+
+async def give_up(state: Dict) -> Dict:
+    """예산 소진: 지금까지 만든 답변 중 평가가 가장 좋은 것을 반환"""
+    logger.info("[NODE] give_up 진입")
+    best_grade = state.get("best_grade")
+    if best_grade is not None and GRADE_RANK[best_grade] >= MIN_RETURNABLE_RANK:
+        logger.info(f"[OUTPUT] returning best answer so far (grade: {best_grade})")
+        return {"generation": state["best_generation"]}
+    logger.info("[OUTPUT] no usable answer within budget")
+    return {"generation": NOT_FOUND_MESSAGE}
+
+
+def route_generation(state: Dict) -> str:
+    """grade_generation 결과에 따라 종료 / 재생성 / 질문 재작성 / 예산 소진 중 선택"""
+    grade = state["generation_grade"]
+    if grade == "relevant":
+        return "relevant"
+    loop = "generate" if grade == "hallucination" else "transform_query"
+    if not can_continue(state, loop):
+        return "give_up"
+    logger.info(f"[DECISION] {grade} → {loop}")
+    return grade
@@ -1,7 +1,10 @@
 from app.agent.state import MessageState
+from app.agent.loop_budget import new_deadline
+from app.utils.department_matcher import SUPPORTED_DEPARTMENTS
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from typing import List
 import os
 import logging
 
@@ -14,90 +17,161 @@ llm = ChatOpenAI(
         openai_api_key=os.getenv("OPENAI_API_KEY")
     )
 
+INAPPROPRIATE_MESSAGE = "죄송합니다. 해당 질문은 서비스 정책에 따라 답변드릴 수 없습니다. 다른 질문을 해주세요."
+OUT_OF_SCOPE_MESSAGE = "해당 질문은 현재 제공 중인 학사 정보 범위에 포함되지 않습니다. 다른 질문을 해보세요."
+
+DOMAIN_DESCRIPTIONS = """
+    - course: 학과별 개설 과목, 과목명 등 수업 정보
+    - curriculum: 학과별 졸업 요건, 학과별 학년별 커리큘럼, 학과별 권장이수
+    - department_intro: 학과 소개, 학과 교수진 정보(전공분야, 연구실 위치, 연구실 회선 전화번호 등등), 학과 사무실 전화 번호, 학과 사무실 위치, 학과 교육 목표, 학과 비교
+    - employment_status: 취업 현황, 진로, 진출 분야
+    - other: 위 분류에 해당하지 않을 경우
+"""
+
 class QueryFilterOutput(BaseModel):
     inappropriate: bool = Field(..., description="질문이 부적절하거나 편향적인 경우 True, 아니면 False")
 
 
-def query_filter(state: MessageState) -> MessageState:
+query_filter_prompt = ChatPromptTemplate.from_messages([
+    ("system", "당신은 질문이 부적절하거나 사회적으로 민감한 내용을 포함하는지 판단하는 필터입니다."),
+    ("human", "다음 질문이 부적절하거나 편향적인가요? 판단해주세요.\n\n질문: {question}")
+])
+query_filter_chain = query_filter_prompt | llm.with_structured_output(QueryFilterOutput)
+
+
+async def query_filter(state: MessageState) -> MessageState:
     question = state["question"]
-    
+
     logger.info("[NODE] query_filter 진입")
     logger.info(f"[INPUT] question: {question}")
 
-    structured_llm = llm.with_structured_output(QueryFilterOutput)
+    result = await query_filter_chain.ainvoke({"question": question})
+    logger.info(f"[OUTPUT] inappropriate: {result.inappropriate}")
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "당신은 질문이 부적절하거나 사회적으로 민감한 내용을 포함하는지 판단하는 필터입니다."),
-        ("human", "다음 질문이 부적절하거나 편향적인가요? 판단해주세요.\n\n질문: {question}")
-    ])
-    chain = prompt | structured_llm
+    # 2단계 경로에서는 학과를 도메인 서브그래프가 직접 추출하므로 이전 턴의 gate 결과를 비움
+    # 자기 교정 루프 예산(deadline / loop 통계)도 턴마다 새로 시작
+    reset = {"departments": [], "department_result": "", "deadline": new_deadline(), "loop": {}}
 
-    result = chain.invoke({"question": question})
-    logger.info(f"[OUTPUT] inappropriate: {result.inappropriate}")
-    
     if(result.inappropriate):
         return {
-            **state,
+            **reset,
             "inappropriate": result.inappropriate,
-            "generation": "죄송합니다. 해당 질문은 서비스 정책에 따라 답변드릴 수 없습니다. 다른 질문을 해주세요."
+            "generation": INAPPROPRIATE_MESSAGE
         }
 
-    return {**state, "inappropriate": result.inappropriate}
+    return {**reset, "inappropriate": result.inappropriate}
 
 
 class RouteQuery(BaseModel):
     """A domain to categorize the user question"""
-    
+
     domain: str = Field(
         description="route the user question among 5 domains, 'course', 'curriculum', 'department_intro', 'employment_status', 'other' "
     )
 
 
-def route_query(state: MessageState) -> MessageState:
-    
-    logger.info("[NODE] route_query 진입")
-    logger.info(f"[INPUT] question: {state['question']}")
-        
-    structured_query_router = llm.with_structured_output(RouteQuery)
-    
-    system = """
+query_router_system = f"""
     너는 유저의 질문을 다섯 가지 도메인 중 하나로 분류하는 분류기 역할을 한다.
     아래 도메인 중 유저의 질문에 가장 적합한 하나를 골라야 한다:
-
-    - course: 학과별 개설 과목, 과목명 등 수업 정보
-    - curriculum: 학과별 졸업 요건, 학과별 학년별 커리큘럼, 학과별 권장이수
-    - department_intro: 학과 소개, 학과 교수진 정보(전공분야, 연구실 위치, 연구실 회선 전화번호 등등), 학과 사무실 전화 번호, 학과 사무실 위치, 학과 교육 목표, 학과 비교
-    - employment_status: 취업 현황, 진로, 진출 분야
-    - other: 위 분류에 해당하지 않을 경우
-
+{DOMAIN_DESCRIPTIONS}
     오직 하나의 도메인만 선택해서 응답하라.
     """
-    
-    query_router_prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", system),
-            ("human", "User question: {question}"),
-        ]
-    )
-    
-    query_router = query_router_prompt | structured_query_router
-    
-    result = query_router.invoke({"question" : state["question"]})
-    
+
+query_router_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", query_router_system),
+        ("human", "User question: {question}"),
+    ]
+)
+query_router = query_router_prompt | llm.with_structured_output(RouteQuery)
+
+
+async def route_query(state: MessageState) -> MessageState:
+
+    logger.info("[NODE] route_query 진입")
+    logger.info(f"[INPUT] question: {state['question']}")
+
+    result = await query_router.ainvoke({"question" : state["question"]})
+
     logger.info(f"[OUTPUT] domain: {result.domain}")
-    
+
     if(result.domain=="other"):
         return {
-            **state,
             "domain": result.domain,
-            "generation": "해당 질문은 현재 제공 중인 학사 정보 범위에 포함되지 않습니다. 다른 질문을 해보세요."
+            "generation": OUT_OF_SCOPE_MESSAGE
         }
 
-    return {**state, "domain": result.domain}
-    
-    
+    return {"domain": result.domain}
+
+
+class GateOutput(BaseModel):
+    """Safety filter, domain routing and department extraction for the user question in a single pass"""
+
+    inappropriate: bool = Field(..., description="질문이 부적절하거나 편향적인 경우 True, 아니면 False")
+    domain: str = Field(
+        description="route the user question among 5 domains, 'course', 'curriculum', 'department_intro', 'employment_status', 'other' "
+    )
+    department_result: str = Field(description="'valid', 'not_supported' or 'not_specific'")
+    departments: List[str] = Field(default_factory=list, description="질문에 포함된 학과명 목록")
+
+
+gate_system = f"""
+    너는 유저의 질문을 한 번에 검사하고 분류하는 역할을 한다. 아래 세 가지를 모두 판단하라.
+
+    1. inappropriate: 질문이 부적절하거나 사회적으로 민감한 내용, 편향적인 내용을 포함하면 True, 아니면 False
+
+    2. domain: 아래 도메인 중 유저의 질문에 가장 적합한 하나
+{DOMAIN_DESCRIPTIONS}
+    3. department_result / departments: 질문이 특정 학과(들)에 대한 질문인지 판별하고, 학과 리스트에 존재하는지 확인하라.
+    - 특정 학과들이 질문에 포함되고 학과 리스트에 있다면: department_result='valid', departments=['학과1','학과2']
+    - 특정 학과가 있지만 리스트에 없다면: department_result='not_supported', departments=['질문에 포함된 학과명']
+    - 특정 학과가 없으면: department_result='not_specific', departments=[]
+    학과 리스트: {', '.join(SUPPORTED_DEPARTMENTS)}
+    """
+
+gate_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", gate_system),
+        ("human", "User question: {question}"),
+    ]
+)
+gate_chain = gate_prompt | llm.with_structured_output(GateOutput)
+
+
+async def gate(state: MessageState) -> MessageState:
+    """query_filter + route_query + 학과 추출을 한 번의 LLM 호출로 처리"""
+    logger.info("[NODE] gate 진입")
+    logger.info(f"[INPUT] question: {state['question']}")
+
+    result = await gate_chain.ainvoke({"question": state["question"]})
+
+    logger.info(f"[OUTPUT] inappropriate: {result.inappropriate}, domain: {result.domain}, "
+                f"department_result: {result.department_result}, departments: {result.departments}")
+
+    update = {
+        "inappropriate": result.inappropriate,
+        "domain": result.domain,
+        "department_result": result.department_result,
+        "departments": result.departments,
+        "deadline": new_deadline(),
+        "loop": {},
+    }
+
+    if result.inappropriate:
+        return {**update, "generation": INAPPROPRIATE_MESSAGE}
+    if result.domain == "other":
+        return {**update, "generation": OUT_OF_SCOPE_MESSAGE}
+    return update
+
+
 def decision(state: MessageState) -> str:
     domain = state.get("domain", "other")
     logger.info("[NODE] decision 진입")
     logger.info(f"[DECISION] selected domain: {domain}")
     return domain
+
+
+def gate_decision(state: MessageState) -> str:
+    if state.get("inappropriate"):
+        return "end"
+    return decision(state)
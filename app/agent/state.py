@@ -1,8 +1,12 @@
-from typing import Annotated
+from typing import Annotated, Dict, List
 from typing import TypedDict
 
 class MessageState(TypedDict):
     question: Annotated[str, "User Question"]
     generation: Annotated[str, "LLM Generation"]
     inappropriate: Annotated[bool, "Result Of Filtering"]
-    domain: Annotated[str, "Routed Domain"]
\ No newline at end of file
+    domain: Annotated[str, "Routed Domain"]
+    departments: Annotated[List[str], "Departments extracted by the gate node"]
+    department_result: Annotated[str, "Result of department check by the gate node"]
+    deadline: Annotated[float, "Epoch seconds after which no new loop iteration starts"]
+    loop: Annotated[Dict, "Calls / seconds per loop node in this request"]
\ No newline at end of file
@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from app.utils.auth import get_current_user
-from app.domains.user.model import User
-from app.agent.graph import graph
+from app.domains.user.schema import AuthenticatedUser
+from app.agent.graph import graph, checkpointer
 from app.agent.state import MessageState
+from app.agent.cache import answer_cache, CACHEABLE_DOMAINS
+from app.agent.loop_budget import ANSWER_TAG, NOT_FOUND_MESSAGE
+from app.utils.document_store import document_scope
+from app.vectorstore.embeddings import query_embedding_cache_stats
 from langchain_core.tracers import LangChainTracer
 from langgraph.errors import GraphRecursionError
+import json
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +22,12 @@ router = APIRouter()
 
 tracer = LangChainTracer()
 
+# 스트리밍 중 이 노드가 (다시) 시작되면 이미 내보낸 답변은 최종 답변이 아님
+RETRACTING_NODES = {"generate", "transform_query", "give_up"}
+
+# 자기 교정 루프는 loop_budget의 시간·횟수 예산으로 끝나므로 recursion_limit은 안전장치로만 사용
+GRAPH_RECURSION_LIMIT = int(os.getenv("GRAPH_RECURSION_LIMIT", "25"))
+
 class ChatRequest(BaseModel):
     query: str
 
@@ -25,30 +37,142 @@ class ChatResponse(BaseModel):
 async def handle_graph_recursion_error(request: Request, exc: GraphRecursionError):
     return JSONResponse(
         status_code=200,
-        content={"response": "관련된 정보를 찾을 수 없습니다. 다른 질문을 시도해보세요."},
+        content={"response": NOT_FOUND_MESSAGE},
     )
 
+def _graph_config(session_id: str) -> dict:
+    return {
+        "configurable": {
+            "thread_id": session_id
+        },
+        "callbacks": [tracer],
+        "recursion_limit": GRAPH_RECURSION_LIMIT
+    }
+
+def _finish_turn(session_id: str):
+    # write-behind면 최종 상태 저장을 백그라운드로 넘기고, 이번 요청의 checkpoint 지표를 기록
+    checkpointer.flush(session_id)
+    logger.info(f"[CHECKPOINT] thread_id={session_id} {checkpointer.pop_request_metrics(session_id)}")
+
+async def _cache_result(question: str, result: dict, cache_version: int):
+    loop = result.get("loop") or {}
+    if loop:
+        logger.info(f"[LOOP] {loop}")
+    if "give_up" in loop:
+        # 예산 안에 평가를 통과하지 못한 답변은 캐시하지 않음
+        return
+    if not result.get("inappropriate") and result.get("domain") in CACHEABLE_DOMAINS:
+        await answer_cache.put(question, result["generation"], result["domain"], version=cache_version)
+
 @router.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest, current_user: User = Depends(get_current_user)):
+async def chat(req: ChatRequest, current_user: AuthenticatedUser = Depends(get_current_user)):
     session_id = current_user.bedrock_session_id
     user_id = current_user.id
-    
+
     print("user_id: ",user_id,"thread_id: ",session_id)
     logger.info(f"[CHAT] New Chat\nuser_id: {user_id}\nthread_id: {session_id}\nquestion: {req.query}\n")
 
+    cached = await answer_cache.get(req.query)
+    if cached is not None:
+        logger.info("[CACHE] hit → graph 실행 생략")
+        return ChatResponse(response=cached)
+
+    cache_version = answer_cache.version()
     inputs = MessageState(question=req.query)
-    config = {
-        "configurable": {
-            "thread_id": session_id
-        },
-        "callbacks": [tracer],
-        "recursion_limit": 10
-    }
+    config = _graph_config(session_id)
 
     try:
-        result = graph.invoke(inputs, config)
+        with document_scope():
+            result = await graph.ainvoke(inputs, config)
     except GraphRecursionError as e:
         logger.warning(f"[GraphRecursionError] {e}")
-        return ChatResponse(response="관련된 정보를 찾을 수 없습니다. 다른 질문을 시도해보세요.")
+        return ChatResponse(response=NOT_FOUND_MESSAGE)
+    finally:
+        _finish_turn(session_id)
+
+    await _cache_result(req.query, result, cache_version)
+
+    return ChatResponse(response=result["generation"])
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/stream")
+async def chat_stream(req: ChatRequest, current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Server-Sent Events로 진행 상황과 답변 토큰을 스트리밍
+    - node: 그래프 노드 진입 {"node": ...}
+    - token: 답변 생성 LLM 호출(ANSWER_TAG)의 토큰 {"content": ...}
+    - retract: 이미 내보낸 답변이 평가를 통과하지 못해 폐기됨 (재생성/질문 재작성) {"node": ...}
+    - done: 최종 답변 {"response": ...} — 클라이언트는 누적 토큰 대신 이 값을 최종 답변으로 사용
+    """
+    session_id = current_user.bedrock_session_id
+    logger.info(f"[CHAT] New Stream Chat\nuser_id: {current_user.id}\nthread_id: {session_id}\nquestion: {req.query}\n")
+
+    async def event_stream():
+        cached = await answer_cache.get(req.query)
+        if cached is not None:
+            logger.info("[CACHE] hit → graph 실행 생략")
+            yield _sse("done", {"response": cached, "cached": True})
+            return
+
+        cache_version = answer_cache.version()
+        inputs = MessageState(question=req.query)
+        config = _graph_config(session_id)
+
+        result = None
+        streamed = False
+
+        try:
+            with document_scope():
+                async for event in graph.astream_events(inputs, config, version="v2"):
+                    kind = event["event"]
+                    node = event.get("metadata", {}).get("langgraph_node")
+
+                    if kind == "on_chain_start" and event["name"] == node:
+                        if streamed and node in RETRACTING_NODES:
+                            streamed = False
+                            yield _sse("retract", {"node": node})
+                        yield _sse("node", {"node": node})
+
+                    elif kind == "on_chat_model_stream" and ANSWER_TAG in event.get("tags", []):
+                        content = event["data"]["chunk"].content
+                        if isinstance(content, str) and content:
+                            streamed = True
+                            yield _sse("token", {"content": content})
+
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        result = event["data"].get("output")
+
+        except GraphRecursionError as e:
+            logger.warning(f"[GraphRecursionError] {e}")
+            if streamed:
+                yield _sse("retract", {"node": None})
+            yield _sse("done", {"response": NOT_FOUND_MESSAGE})
+            return
+        finally:
+            _finish_turn(session_id)
+
+        if not isinstance(result, dict) or "generation" not in result:
+            yield _sse("done", {"response": NOT_FOUND_MESSAGE})
+            return
+
+        await _cache_result(req.query, result, cache_version)
+        yield _sse("done", {"response": result["generation"]})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+def cache_stats():
+    return {
+        "answer_cache": answer_cache.stats(),
+        "query_embedding_cache": query_embedding_cache_stats()
+    }
 
-    return ChatResponse(response=result["generation"])
\ No newline at end of file
+@router.get("/checkpoint/stats")
+def checkpoint_stats():
+    return checkpointer.stats()
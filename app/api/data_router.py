@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Query, HTTPException
-from app.vectorstore.qdrant import add_documents, delete_documents
+from typing import List
+from fastapi import APIRouter, Query, HTTPException, status
+from app.vectorstore.qdrant import delete_documents
+from app.agent.cache import answer_cache
+from app.utils.ingestion_jobs import job_manager, IngestionJobStatus
 from app.domains.course.ingestor import CourseIngestor
+from app.domains.course.course_index import clear_course_index
 from app.domains.curriculum.ingestor import CurriculumIngestor
 from app.domains.department_intro.ingestor import DepartmentIntroIngestor
 from app.domains.employment_status.ingestor import EmploymentStatusIngestor
@@ -14,20 +18,48 @@ domain_map = {
     "employment_status": EmploymentStatusIngestor,
 }
 
-@router.post("/embed")
-def embed_documents(domain: str = Query(...)):
+@router.post("/embed", response_model=IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def embed_documents(domain: str = Query(...)):
     Ingestor = domain_map.get(domain)
     if not Ingestor:
         raise HTTPException(status_code=400, detail=f"⚠잘못된 파라미터 요청입니다. : {domain}")
 
-    ingestor = Ingestor()
-    docs = ingestor.ingest(data_path=f"scripts/{domain}/data")
-    add_documents(domain, docs)
-    return {"message": f"✅ '{domain}' 도메인의 문서 {len(docs)}개 업로드 완료"}
+    def on_complete(result: dict):
+        if result["added"] or result["removed"]:
+            answer_cache.invalidate_domain(domain)
+
+    try:
+        return job_manager.submit(domain, Ingestor, on_complete=on_complete)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"⚠'{domain}' 도메인의 적재 작업이 이미 실행 중입니다. : {e}")
+
+@router.get("/jobs", response_model=List[IngestionJobStatus])
+def list_jobs():
+    return job_manager.list()
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobStatus)
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"⚠존재하지 않는 작업입니다. : {job_id}")
+    return job
+
+@router.delete("/jobs/{job_id}", response_model=IngestionJobStatus)
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"⚠존재하지 않는 작업입니다. : {job_id}")
+    return job
 
 @router.delete("/embed")
 def delete_domain_documents(domain: str = Query(...)):
     if domain not in domain_map:
         raise HTTPException(status_code=400, detail=f"⚠잘못된 파라미터 요청입니다. : {domain}")
+    if job_manager.active_job(domain):
+        raise HTTPException(status_code=409, detail=f"⚠'{domain}' 도메인의 적재 작업이 실행 중입니다.")
     delete_documents(domain)
-    return {"message": f"🗑️ '{domain}' 도메인의 문서가 모두 삭제되었습니다"}
\ No newline at end of file
+    if domain == "course":
+        # 삭제된 과목이 색인의 정확 일치로 계속 답변되지 않도록 비움
+        clear_course_index()
+    answer_cache.invalidate_domain(domain)
+    return {"message": f"🗑️ '{domain}' 도메인의 문서가 모두 삭제되었습니다"}
@@ -1,15 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.domains.user.schema import SignupRequest, SignupResponse, LoginRequest, LoginResponse
 from app.domains.user.service import signup_user, login_user
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_db, db_pool_stats
+from app.utils.password_hasher import password_hasher
+from app.utils.session_provider import session_provider
 
 router = APIRouter()
 
 @router.post("/signup", response_model=SignupResponse)
-def signup(request: SignupRequest, db: Session = Depends(get_db)):
-    return signup_user(request, db)
+async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
+    return await signup_user(request, db)
 
 @router.post("/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    return login_user(request, db)
\ No newline at end of file
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    return await login_user(request, db)
+
+@router.get("/db/stats")
+def db_stats():
+    return db_pool_stats()
+
+@router.get("/password-hasher/stats")
+def password_hasher_stats():
+    return password_hasher.stats()
+
+@router.get("/session-pool/stats")
+def session_pool_stats():
+    return session_provider.stats()
\ No newline at end of file
@@ -1,15 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import List
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
 from langchain_core.documents import Document
+import time
 
 class BaseIngestor(ABC):
     """
     PDF/TXT 등에서 Document 객체 리스트를 추출
     """
 
+    def __init__(self):
+        # 단계별 소요 시간(초). ingest 중 stage()로 감싼 구간이 누적된다.
+        self.timings: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
     @abstractmethod
     def ingest(self, data_path: str) -> List[Document]:
         """
         지정된 경로에서 데이터를 읽고 Document 리스트를 반환
         """
-        pass
\ No newline at end of file
+        pass
+
+    def on_synced(self, docs: List[Document]) -> None:
+        """
+        ingest 결과가 벡터 DB에 모두 반영된 뒤 호출 (파생 색인 갱신 등)
+        적재가 실패하거나 취소되면 호출되지 않는다.
+        """
\ No newline at end of file
@@ -0,0 +1,251 @@
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.utils.department_matcher import SUPPORTED_DEPARTMENTS
+import json
+import logging
+import os
+import re
+import tempfile
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+COURSE_INDEX_PATH = os.getenv("COURSE_INDEX_PATH", os.path.join(BASE_DIR, ".cache", "course_index.json"))
+
+# 청크 첫 줄: "SCE191 SW커리어세미나"
+_HEADER_PATTERN = re.compile(r"^\s*([A-Z]{3,4}\d{3,4})\s*(.*)$")
+# 질문 속 과목 코드 (색인에 있는 코드만 매칭되므로 형식은 넓게 허용)
+_QUESTION_CODE_PATTERN = re.compile(r"(?<![A-Za-z0-9])([A-Za-z]{1,4}\d{3,6})(?![0-9])")
+_TOKEN_PATTERN = re.compile(r"[가-힣A-Za-z0-9]+")
+# 조사 등 어미를 떼고 비교하기 위한 목록 (긴 것부터)
+_SUFFIXES = sorted(["은", "는", "이", "가", "을", "를", "의", "에", "에서", "이랑", "랑", "과", "와", "도", "만", "이야", "야", "이에요", "예요", "인가요", "수업", "과목"], key=len, reverse=True)
+
+# 과목명 외에 이 단어들만 있는 질문("데이터베이스 수업 알려줘")은 해당 과목을 묻는 질문으로 보고 정확 일치로 처리
+_QUESTION_FILLERS = set(_SUFFIXES) | {
+    "강의", "과목명", "코드", "정보", "설명", "내용", "소개", "대해", "대해서", "에대해", "에대해서", "좀",
+    "알려줘", "알려주세요", "알려줄래", "뭐야", "뭐예요", "뭔가요", "무엇", "무엇인가요", "어때", "어때요", "어떤", "어떤가요", "어떤지",
+    "몇", "학년", "학점", "언제",
+}
+
+MIN_NAME_LENGTH = 3
+MIN_PREFIX_LENGTH = 3
+FUZZY_THRESHOLD = 0.8
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _strip_suffix(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+class CourseIndex:
+    """
+    과목 코드 / 과목명 → 과목 청크 색인
+    - 코드: 완전 일치
+    - 과목명: 질문에 포함된 전체 과목명, 앞부분만 입력한 경우(prefix), 오타(fuzzy)
+    같은 코드가 여러 학과 PDF에 있을 수 있으므로 값은 청크 리스트
+    """
+
+    def __init__(self, entries: Optional[List[Dict]] = None):
+        self.entries: List[Dict] = entries or []
+        self._by_code: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        for position, entry in enumerate(self.entries):
+            self._by_code.setdefault(entry["code"], []).append(position)
+            name = _normalize(entry["name"])
+            if len(name) >= MIN_NAME_LENGTH:
+                self._by_name.setdefault(name, []).append(position)
+        # prefix 검색용 정렬된 과목명, 질문 속 과목명 검색은 긴 이름부터
+        self._sorted_names = sorted(self._by_name)
+        self._names_by_length = sorted(self._by_name, key=len, reverse=True)
+
+    @classmethod
+    def from_documents(cls, docs: List[Document]) -> "CourseIndex":
+        entries = []
+        for doc in docs:
+            lines = [line.strip() for line in doc.page_content.strip().splitlines() if line.strip()]
+            match = _HEADER_PATTERN.match(lines[0]) if lines else None
+            if not match:
+                continue
+            name_en = lines[1].lstrip("—-– ").strip() if len(lines) > 1 and lines[1].startswith(("—", "-", "–")) else ""
+            entries.append({
+                "code": match.group(1),
+                "name": match.group(2).strip(),
+                "name_en": name_en,
+                "text": doc.page_content,
+                "metadata": {**doc.metadata, "domain": "course"},
+            })
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # --- 조회 ---
+
+    def _filter(self, positions: List[int], department: Optional[str]) -> List[Dict]:
+        entries = [self.entries[p] for p in positions]
+        if department:
+            entries = [e for e in entries if e["metadata"].get("department") == department]
+        return entries
+
+    def by_code(self, code: str, department: Optional[str] = None) -> List[Dict]:
+        return self._filter(self._by_code.get(code.upper(), []), department)
+
+    def by_name(self, name: str, department: Optional[str] = None) -> List[Dict]:
+        return self._filter(self._by_name.get(_normalize(name), []), department)
+
+    def by_prefix(self, prefix: str, department: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        prefix = _normalize(prefix)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+        found = []
+        start = bisect_left(self._sorted_names, prefix)
+        for name in self._sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            found += self._filter(self._by_name[name], department)
+            if len(found) >= limit:
+                break
+        return found[:limit]
+
+    def fuzzy(self, text: str, department: Optional[str] = None, limit: int = 3) -> List[Tuple[float, Dict]]:
+        text = _normalize(text)
+        if len(text) < MIN_NAME_LENGTH:
+            return []
+        scored = []
+        for name, positions in self._by_name.items():
+            # 길이 차이가 크면 ratio 상한이 threshold 미만이므로 계산 생략
+            if 2 * min(len(name), len(text)) / (len(name) + len(text)) < FUZZY_THRESHOLD:
+                continue
+            score = SequenceMatcher(None, text, name).ratio()
+            if score >= FUZZY_THRESHOLD:
+                scored += [(score, entry) for entry in self._filter(positions, department)]
+        scored.sort(key=lambda item: -item[0])
+        return scored[:limit]
+
+    def lookup(self, question: str, department: Optional[str] = None) -> Tuple[str, List[Dict]]:
+        """
+        질문에서 과목을 찾아 (match_type, 청크 리스트) 반환
+        match_type: "code" / "name" (정확히 일치 → 벡터 검색 생략 가능),
+                    "mention" / "prefix" / "fuzzy" (후보 → 벡터 검색 결과와 합쳐 평가), "" (없음)
+        "name"은 질문이 사실상 과목명뿐일 때만이고, 추천·비교처럼 과목명 외의 내용이 있으면 "mention"
+        """
+        hits: List[Dict] = []
+        for code in dict.fromkeys(c.upper() for c in _QUESTION_CODE_PATTERN.findall(question)):
+            hits += self.by_code(code, department)
+        if hits:
+            return "code", hits
+
+        # 학과명 안의 단어가 과목명으로 잡히지 않도록 학과명은 지우고 비교
+        for department_name in SUPPORTED_DEPARTMENTS:
+            question = question.replace(department_name, " ")
+        normalized = _normalize(question)
+        found = []
+        for name in self._names_by_length:
+            if name in normalized:
+                hits += self._filter(self._by_name[name], department)
+                normalized = normalized.replace(name, " ")
+                found.append(name)
+        if hits:
+            return ("name" if self._only_names(question, found) else "mention"), hits
+
+        tokens = [_strip_suffix(token) for token in _TOKEN_PATTERN.findall(question)]
+        for token in tokens:
+            hits += self.by_prefix(token, department)
+        if hits:
+            return "prefix", hits
+
+        for token in tokens:
+            hits += [entry for _, entry in self.fuzzy(token, department)]
+        if hits:
+            return "fuzzy", hits
+        return "", []
+
+    @staticmethod
+    def _only_names(question: str, names: List[str]) -> bool:
+        """질문에서 과목명을 지운 나머지 단어가 조사 / 요청 표현뿐인지"""
+        for token in _TOKEN_PATTERN.findall(question):
+            token = _normalize(token)
+            for name in names:
+                token = token.replace(name, "")
+            if token and token not in _QUESTION_FILLERS and _strip_suffix(token) not in _QUESTION_FILLERS:
+                return False
+        return True
+
+    # --- 저장 / 로드 ---
+
+    def save(self, path: str = COURSE_INDEX_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".course_index-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = COURSE_INDEX_PATH) -> Optional["CourseIndex"]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f)["entries"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+_index: Optional[CourseIndex] = None
+# 메모리의 색인을 읽어온 시점의 파일 mtime. 다른 워커가 파일을 교체하면 다시 읽는다.
+_index_mtime: Optional[float] = None
+
+
+def _file_mtime(path: str = COURSE_INDEX_PATH) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def set_course_index(index: CourseIndex, persist: bool = True) -> None:
+    """적재 완료 시 새 색인으로 교체하고 디스크에 저장"""
+    global _index, _index_mtime
+    if persist:
+        index.save()
+    _index = index
+    _index_mtime = _file_mtime() if persist else None
+    logger.info(f"[COURSE_INDEX] {len(index)} courses indexed")
+
+
+def clear_course_index() -> None:
+    """course 문서 삭제 시 빈 색인으로 교체 (다른 워커도 파일 변경을 보고 비움)"""
+    set_course_index(CourseIndex())
+
+
+async def get_course_index() -> CourseIndex:
+    """
+    저장된 색인을 읽어 프로세스 안에서 재사용
+    파일이 없으면(새 컨테이너 등) Qdrant에 적재된 course 청크로 한 번 다시 만든다.
+    다른 워커가 적재/삭제로 파일을 교체하면(mtime 변경) 다시 읽는다.
+    """
+    global _index, _index_mtime
+    mtime = _file_mtime()
+    if _index is not None and (mtime is None or mtime == _index_mtime):
+        return _index
+    index = CourseIndex.load()
+    if index is None:
+        from app.vectorstore.qdrant import scroll_documents
+        try:
+            index = CourseIndex.from_documents(await scroll_documents("course"))
+        except Exception as e:
+            logger.warning(f"[COURSE_INDEX] rebuild from Qdrant failed: {e}")
+            return CourseIndex()
+        if len(index):
+            set_course_index(index)
+            return index
+    _index = index
+    _index_mtime = mtime
+    return index
@@ -1,8 +1,9 @@
 import os
 import re
-from langchain_community.document_loaders import PDFPlumberLoader
 from langchain_core.documents import Document
 from app.domains.base_ingestor import BaseIngestor
+from app.utils.pdf_parser import load_pdf_pages
+from app.domains.course.course_index import CourseIndex, set_course_index
 
 class CourseIngestor(BaseIngestor):
     def ingest(self, data_path: str) -> list[Document]:
@@ -13,17 +14,16 @@ class CourseIngestor(BaseIngestor):
         
         code_pattern = r"(?m)(?=^[A-Z]{3,4}\d{3,4})" 
 
-        for filename in os.listdir(full_path):
-            if not filename.lower().endswith(".pdf"):
-                continue
+        # 파일 순서를 고정해 chunk 순서가 실행마다 같도록 함
+        filenames = sorted(f for f in os.listdir(full_path) if f.lower().endswith(".pdf"))
+        with self.stage("parse"):
+            parsed = load_pdf_pages([os.path.join(full_path, filename) for filename in filenames])
 
-            path = os.path.join(full_path, filename)
+        for filename, pages in zip(filenames, parsed):
             department = os.path.splitext(filename)[0]
-            print(f"📄 Loading {filename} (department={department})")
+            print(f"📄 Loaded {filename} (department={department}, pages={len(pages)})")
 
-            loader = PDFPlumberLoader(path)
-            pages = loader.load()
-            full_text = "\n".join(page.page_content for page in pages)
+            full_text = "\n".join(pages)
 
             chunks = re.split(code_pattern, full_text)
             print(f"  ▶ Split into {len(chunks)} chunks")
@@ -39,3 +39,7 @@ class CourseIngestor(BaseIngestor):
                 ))
 
         return docs
+
+    def on_synced(self, docs: list[Document]) -> None:
+        # 과목 코드 / 과목명 색인을 적재가 끝난 청크로 교체 (retrieve에서 정확히 일치하면 벡터 검색 생략)
+        set_course_index(CourseIndex.from_documents(docs))
@@ -1,12 +1,19 @@
+from typing import Dict, List
 from app.domains.course.state import CourseState
 from app.vectorstore.qdrant import similarity_search
+from app.domains.course.course_index import get_course_index
 from app.utils.document_formatter import format_documents
+from app.utils.document_store import resolve_documents, to_refs
+from app.utils.document_grader import grade_documents_batch
+from app.agent.loop_budget import ANSWER_TAG, can_continue, record_candidate
+from app.utils.department_matcher import match_departments, SUPPORTED_DEPARTMENTS
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel, Field
 import os
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -18,9 +25,22 @@ class DepartmentExtracted(BaseModel):
     result: str  # "valid", "not_supported", "not_specific"
     department: str = ""
 
-def extract_department(state: CourseState) -> CourseState:
+async def extract_department(state: CourseState) -> CourseState:
     logger.info("[NODE] extract_department 진입")
     logger.info(f"[INPUT] question: {state['question']}")
+
+    if state.get("department_result"):
+        # gate 노드에서 학과를 이미 추출한 경우 LLM 호출 생략
+        departments = state.get("departments", [])
+        department = departments[0] if departments else ""
+        logger.info(f"[OUTPUT] (gate) result: {state['department_result']}, department: {department}")
+        return {"department": department}
+
+    match = match_departments(state["question"], multiple=False)
+    if match.result != "ambiguous":
+        department = match.departments[0] if match.departments else ""
+        logger.info(f"[OUTPUT] (local) result: {match.result}, department: {department}")
+        return {"department": department, "department_result": match.result}
     
     prompt = ChatPromptTemplate.from_messages([
         ("system", 
@@ -28,14 +48,14 @@ def extract_department(state: CourseState) -> CourseState:
         "- 특정 학과에 대한 질문이고 학과 리스트에 있다면: result='valid', department='학과명'\n"
         "- 특정 학과에 대한 질문이지만 학과 리스트에 없다면: result='not_supported', department='질문에 포함된 학과명'\n"
         "- 특정 학과에 대한 질문이 아니면: result='not_specific', department=''\n"
-        "학과 리스트: 소프트웨어학과, 디지털미디어학과, 국방디지털융합학과, 인공지능융합학과, 사이버보안학과"),
+        f"학과 리스트: {', '.join(SUPPORTED_DEPARTMENTS)}"),
         ("human", "{question}")
     ])
     chain = prompt | llm.with_structured_output(DepartmentExtracted)
-    result = chain.invoke({"question": state["question"]})
+    result = await chain.ainvoke({"question": state["question"]})
 
     logger.info(f"[OUTPUT] result: {result.result}, department: {result.department}")
-    return {**state, "department": result.department, "department_result": result.result}
+    return {"department": result.department, "department_result": result.result}
 
 def route_by_department_result(state: CourseState) -> str:
     return state["department_result"]
@@ -43,22 +63,41 @@ def route_by_department_result(state: CourseState) -> str:
 def not_supported_department(state: CourseState) -> CourseState:
     logger.info("[NODE] not_supported_department 진입")
     return {
-        **state,
         "generation": "죄송합니다. 현재 아주대학교에는 해당 학과가 존재하지 않아 안내드릴 수 없습니다."
     }
 
 # ✅ 2. 검색
-def retrieve(state: CourseState) -> CourseState:
+def _unique_texts(hits: List[Dict]) -> List[Dict]:
+    """여러 학과 PDF에 같은 과목이 있어 본문이 같은 청크(PDF 추출 공백 차이 무시)는 첫 번째만 남김"""
+    seen = set()
+    unique = []
+    for hit in hits:
+        text = re.sub(r"\s+", "", hit["text"])
+        if text not in seen:
+            seen.add(text)
+            unique.append(hit)
+    return unique
+
+async def retrieve(state: CourseState) -> CourseState:
     logger.info("[NODE] retrieve 진입")
     filters = {"metadata.department": state["department"]} if state["department"] else None
     logger.info(f"[INPUT] filters: {filters}")
-    
-    hits = similarity_search(state["question"], domain="course", k=5, metadata_filters=filters)
-    
-    formatted_docs = format_documents(hits)
-    
-    logger.info(f"[OUTPUT] {len(formatted_docs )} documents retrieved")
-    return {**state, "documents": formatted_docs}
+
+    # 과목 코드가 있거나 질문이 사실상 과목명뿐이면 임베딩 + 벡터 검색 없이 해당 청크를 사용
+    course_index = await get_course_index()
+    match_type, index_hits = course_index.lookup(state["question"], department=state["department"] or None)
+    if match_type in ("code", "name"):
+        index_hits = _unique_texts(index_hits)
+        logger.info(f"[OUTPUT] ({match_type} match) {len(index_hits)} documents retrieved")
+        return {"documents": to_refs(index_hits), "exact_match": True}
+
+    hits = await similarity_search(state["question"], domain="course", k=5, metadata_filters=filters)
+    # 과목명 언급 / prefix / fuzzy 후보는 벡터 검색 결과 앞에 붙이고, 같은 본문은 한 번만 남김
+    hits = _unique_texts(index_hits + hits)
+
+    # state에는 point id / score만 담고 본문은 평가·생성 단계에서 캐시에서 꺼내 씀
+    logger.info(f"[OUTPUT] {len(hits)} documents retrieved")
+    return {"documents": to_refs(hits), "exact_match": False}
 
 # ✅ 3. 문서 평가
 class GradeDocuments(BaseModel):
@@ -68,9 +107,14 @@ class GradeDocuments(BaseModel):
         description="Documents are relevant to the question, 'yes' or 'no'"
     )
 
-def grade_documents(state: CourseState) -> CourseState:
+async def grade_documents(state: CourseState) -> CourseState:
     logger.info("[NODE] grade_documents 진입")
 
+    if state.get("exact_match"):
+        # 과목 코드 / 과목명으로 바로 찾은 청크는 관련성 평가 생략
+        logger.info(f"[OUTPUT] {len(state['documents'])} exact-match documents passed without grading")
+        return {}
+
     structured_llm_grader = llm.with_structured_output(GradeDocuments)
 
     system = """You are a grader assessing whether a retrieved document is meaningfully relevant to a user question.\n
@@ -89,51 +133,60 @@ def grade_documents(state: CourseState) -> CourseState:
     retrieval_grader = grade_prompt | structured_llm_grader
     
     question = state["question"]
-    documents = state["documents"]
+    hits = await resolve_documents(state["documents"])
+    documents = format_documents(hits)
     
+    logger.info(f"[EVAL] {len(documents)}건 문서 평가 중...")
+    scores = await grade_documents_batch(retrieval_grader, llm, system, question, documents)
+
     filtered = []
-    for i, doc in enumerate(documents):
-        logger.info(f"[EVAL] Doc {i+1} 평가 중...")
-        result = retrieval_grader.invoke({"question": question, "document": doc})
-        logger.info(f"[RESULT] Doc {i+1}: {result.binary_score}")
-        if result.binary_score == "yes":
-            filtered.append(doc)
+    for i, (hit, score) in enumerate(zip(hits, scores)):
+        logger.info(f"[RESULT] Doc {i+1}: {score}")
+        if score == "yes":
+            filtered.append(hit)
 
     logger.info(f"[OUTPUT] {len(filtered)} documents passed relevance filter")
-    return {**state, "documents": filtered}
+    return {"documents": to_refs(filtered)}
 
 # ✅ 4. 결정
 def decide_to_generate(state: CourseState) -> str:
     logger.info("[NODE] decide_to_generate 진입")
     if not state["documents"]:
+        if not can_continue(state, "transform_query"):
+            logger.info("[DECISION] No relevant documents, budget exhausted → give_up")
+            return "give_up"
         logger.info("[DECISION] No relevant documents → transform_query")
         return "transform_query"
+    if not can_continue(state, "generate"):
+        logger.info("[DECISION] Relevant documents found, budget exhausted → give_up")
+        return "give_up"
     logger.info("[DECISION] Relevant documents found → generate")
     return "generate"
 
 # ✅ 5. 생성
-def generate(state: CourseState) -> CourseState:    
+async def generate(state: CourseState) -> CourseState:    
     logger.info("[NODE] generate 진입")
     prompt = ChatPromptTemplate.from_messages([
         ("system", "다음 문서를 참고하여 질문에 답변을 생성하세요.\n 만약, 문서 내에서 특정 과목에 대한 내용을 참고하여 답변을 생성한다면, 과목 코드를 참고하여 해당 과목이 몇 학년 때 수강하기를 권장하는 지에 대한 정보도 함께 제공하세요. 과목 코드는 영어 알파벳 3~4글자 + 숫자 3~4글자로 구성되며, 맨 처음 숫자가 해당 과목의 권장 수강 학년입니다. "),
         ("human", "문서들: {documents}\n\n질문: {question}")
     ])
-    chain = prompt | llm
-    response = chain.invoke({
-        "documents": "\n\n".join(state["documents"]),
+    chain = prompt | llm.with_config(tags=[ANSWER_TAG])
+    documents = format_documents(await resolve_documents(state["documents"]))
+    response = await chain.ainvoke({
+        "documents": "\n\n".join(documents),
         "question": state["question"]
     })
     logger.info(f"[OUTPUT] Generation (first 200 chars): {response.content[:200]}")
-    return {**state, "generation": response.content}
+    return {"generation": response.content}
 
 # ✅ 6. 환각/관련성 평가
 class GenEval(BaseModel):
     binary_score: str
 
-def grade_generation_v_documents_and_question(state: CourseState) -> str:
+async def grade_generation_v_documents_and_question(state: CourseState) -> str:
     logger.info("[NODE] grade_generation_v_documents_and_question 진입")
     gen = state["generation"]
-    docs = state["documents"]
+    docs = format_documents(await resolve_documents(state["documents"]))
     question = state["question"]
 
     doc_prompt = ChatPromptTemplate.from_messages([
@@ -143,11 +196,11 @@ def grade_generation_v_documents_and_question(state: CourseState) -> str:
         ("human", "Set of facts: \n\n {documents} \n\n LLM generation: {generation}")
     ])
     doc_chain = doc_prompt | llm.with_structured_output(GenEval)
-    doc_check = doc_chain.invoke({"generation": gen, "documents": "\n\n".join(docs)})
+    doc_check = await doc_chain.ainvoke({"generation": gen, "documents": "\n\n".join(docs)})
     logger.info(f"[EVAL] groundedness → {doc_check.binary_score}")
     
     if doc_check.binary_score != "yes":
-        logger.info("[DECISION] hallucination detected → regenerate")
+        logger.info("[EVAL] hallucination detected")
         return "hallucination"
     
     system = """You are a grader assessing whether an answer addresses / resolves a question \n 
@@ -158,23 +211,28 @@ def grade_generation_v_documents_and_question(state: CourseState) -> str:
         ("human", "User question: \n\n {question} \n\n LLM generation: {generation}")
     ])
     q_chain = q_prompt | llm.with_structured_output(GenEval)
-    q_check = q_chain.invoke({"question": question, "generation": gen})
+    q_check = await q_chain.ainvoke({"question": question, "generation": gen})
     logger.info(f"[EVAL] relevance to question → {q_check.binary_score}")
 
     return "relevant" if q_check.binary_score == "yes" else "not relevant"
 
+async def grade_generation(state: CourseState) -> CourseState:
+    """생성된 답변을 평가하고, 지금까지의 최선 답변을 갱신"""
+    grade = await grade_generation_v_documents_and_question(state)
+    return {"generation_grade": grade, **record_candidate(state, grade)}
+
 # ✅ 7. 쿼리 재작성
 class Rewritten(BaseModel):
     question: str
 
-def transform_query(state: CourseState) -> CourseState:
+async def transform_query(state: CourseState) -> CourseState:
     logger.info("[NODE] transform_query 진입")
     prompt = ChatPromptTemplate.from_messages([
         ("system",  "질문을 더 명확하게 한국어로 재작성해주세요."),
         ("human", "{question}")
     ])
     chain = prompt | llm.with_structured_output(Rewritten)
-    better_question = chain.invoke({"question": state["question"]})
+    better_question = await chain.ainvoke({"question": state["question"]})
     
     logger.info(f"[OUTPUT] transformed question: {better_question.question}")
-    return {**state, "question": better_question.question}
+    return {"question": better_question.question}
@@ -0,0 +1,241 @@
+from html.parser import HTMLParser
+from html.entities import html5
+from typing import Any, Dict, List, Optional, Union
+import re
+
+TEXT_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6"}
+TABLE_TAG = "table"
+
+# BeautifulSoup(html.parser)와 같은 트리를 만들기 위한 규칙
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta", "param",
+    "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+}
+# 이 태그 안의 문자열은 get_text 결과에서 빠짐
+NON_TEXT_CONTAINERS = {"script", "style", "template", "rt", "rp"}
+
+_DECIMAL_REFERENCE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE = re.compile("^([0-9a-f]+)(.*)")
+
+
+def _numeric_reference(code: int) -> str:
+    if code == 0 or code > 0x10FFFF or 0xD800 <= code <= 0xDFFF:
+        return "\ufffd"
+    if 0x80 <= code <= 0x9F:
+        # windows-1252 코드로 잘못 적힌 참조는 해당 문자로 바꿈
+        try:
+            return bytes([code]).decode("cp1252")
+        except UnicodeDecodeError:
+            pass
+    return chr(code)
+
+
+class HTMLNode:
+    """테이블 변환에 필요한 만큼만 구현한 경량 태그 노드 (BeautifulSoup Tag와 같은 find/get_text 의미)"""
+
+    __slots__ = ("name", "attrs", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, str]):
+        self.name = name
+        self.attrs = attrs
+        self.children: List[Union["HTMLNode", str]] = []
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+    def find_all(self, names: Union[str, List[str]]) -> List["HTMLNode"]:
+        names = {names} if isinstance(names, str) else set(names)
+        found = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, HTMLNode):
+                if node.name in names:
+                    found.append(node)
+                stack.extend(reversed(node.children))
+        return found
+
+    def find(self, name: str) -> Optional["HTMLNode"]:
+        found = self.find_all(name)
+        return found[0] if found else None
+
+    def strings(self) -> List[str]:
+        result = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, HTMLNode):
+                stack.extend(reversed(node.children))
+            else:
+                result.append(node)
+        return result
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        strings = self.strings()
+        if strip:
+            strings = [s.strip() for s in strings if s.strip()]
+        return separator.join(strings)
+
+
+class ElementStreamParser(HTMLParser):
+    """
+    페이지 HTML을 한 번만 훑으면서 table / 텍스트 요소를 문서 순서대로 추출
+
+    BeautifulSoup(html.parser)로 만든 트리에서
+    find_all(['table', 'p', 'div', 'h1'..'h6'])을 돌며 decompose하고 남은 텍스트를 모으던 기존 방식과 같은 결과를 낸다.
+    - 가장 바깥쪽 대상 태그만 요소가 되고, 그 안에 중첩된 대상 태그는 바깥 요소에 포함됨
+    - 텍스트 요소는 get_text(strip=True) 기준 10자 초과만 남김
+    - 어떤 대상 태그에도 속하지 않은 문자열은 마지막에 하나의 'remaining' 텍스트 요소로 추가
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.elements: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+        self._non_text_depth = 0
+        self._closed_void_tags: List[str] = []
+        self._data: List[str] = []
+        self._remaining: List[str] = []
+
+        # 현재 수집 중인 대상 요소
+        self._capture_depth: Optional[int] = None
+        self._capture_tag: Optional[str] = None
+        self._capture_strings: List[str] = []
+        self._table_stack: List[HTMLNode] = []
+
+    # --- 트리 구성 (BeautifulSoup html.parser 빌더와 같은 규칙) ---
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._flush_data()
+        attr_dict = {key: ("" if value is None else value) for key, value in attrs}
+        self._push(tag, attr_dict)
+        if handle_empty_element and tag in VOID_TAGS:
+            self._pop_to(tag)
+            self._closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self._closed_void_tags:
+            self._closed_void_tags.remove(tag)
+            return
+        self._flush_data()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        base, pattern = 10, _DECIMAL_REFERENCE
+        if name[:1] in ("x", "X"):
+            name, base, pattern = name[1:], 16, _HEX_REFERENCE
+        extra = ""
+        try:
+            code = int(name, base)
+        except ValueError:
+            # 세미콜론 없이 끝난 참조: 숫자 부분만 참조로 보고 나머지는 일반 텍스트로 처리
+            match = pattern.search(name)
+            if match is None:
+                self.handle_data(name)
+                return
+            code, extra = int(match.group(1), base), match.group(2)
+        self.handle_data(_numeric_reference(code))
+        if extra:
+            self.handle_data(extra)
+
+    def handle_entityref(self, name):
+        self.handle_data(html5.get(name + ";", "&" + name))
+
+    def handle_comment(self, data):
+        self._flush_data()
+
+    def handle_decl(self, decl):
+        self._flush_data()
+
+    def handle_pi(self, data):
+        self._flush_data()
+
+    def unknown_decl(self, data):
+        self._flush_data()
+        if data.upper().startswith("CDATA["):
+            # CDATA는 script/style 등의 안에 있어도 텍스트로 취급됨
+            self._data.append(data[len("CDATA["):])
+            self._flush_data(always_text=True)
+
+    def close(self):
+        super().close()
+        self._flush_data()
+        if self._capture_depth is not None:
+            self._finish_capture()
+
+    # --- 내부 처리 ---
+
+    def _push(self, tag: str, attrs: Dict[str, str]):
+        if self._capture_depth is None and (tag == TABLE_TAG or tag in TEXT_TAGS):
+            self._capture_depth = len(self._stack)
+            self._capture_tag = tag
+            self._capture_strings = []
+            self._table_stack = [HTMLNode(tag, attrs)] if tag == TABLE_TAG else []
+        elif self._table_stack:
+            node = HTMLNode(tag, attrs)
+            self._table_stack[-1].children.append(node)
+            self._table_stack.append(node)
+
+        self._stack.append(tag)
+        if tag in NON_TEXT_CONTAINERS:
+            self._non_text_depth += 1
+
+    def _pop_to(self, tag: str):
+        if tag not in self._stack:
+            return
+        while self._stack:
+            popped = self._stack.pop()
+            if popped in NON_TEXT_CONTAINERS:
+                self._non_text_depth -= 1
+            if self._capture_depth is not None:
+                if len(self._stack) == self._capture_depth:
+                    self._finish_capture()
+                elif self._table_stack:
+                    self._table_stack.pop()
+            if popped == tag:
+                return
+
+    def _flush_data(self, always_text: bool = False):
+        if not self._data:
+            return
+        text = "".join(self._data)
+        self._data = []
+        if self._non_text_depth and not always_text:
+            return
+        if self._table_stack:
+            self._table_stack[-1].children.append(text)
+        elif self._capture_depth is not None:
+            self._capture_strings.append(text)
+        else:
+            self._remaining.append(text)
+
+    def _finish_capture(self):
+        if self._capture_tag == TABLE_TAG:
+            table = self._table_stack[0]
+            self.elements.append({"type": "table", "node": table})
+        else:
+            text_content = "".join(s.strip() for s in self._capture_strings if s.strip())
+            if text_content and len(text_content) > 10:
+                self.elements.append({"type": "text", "content": text_content, "element_tag": self._capture_tag})
+        self._capture_depth = None
+        self._capture_tag = None
+        self._capture_strings = []
+        self._table_stack = []
+
+    def remaining_text(self) -> str:
+        remaining = "\n".join(s.strip() for s in self._remaining if s.strip())
+        return re.sub(r'\n\s*\n', '\n\n', remaining)
+
+
+def extract_elements(html_content: str) -> ElementStreamParser:
+    parser = ElementStreamParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser
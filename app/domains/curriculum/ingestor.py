@@ -1,6 +1,5 @@
 import os
 import tempfile
-import re
 from typing import List, Dict, Any
 from uuid import uuid4
 from langchain_core.documents import Document
@@ -8,7 +7,8 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_upstage import UpstageDocumentParseLoader
 from app.domains.base_ingestor import BaseIngestor
 from app.utils.s3_uploader import upload_file_to_s3
-from bs4 import BeautifulSoup
+from app.utils.parse_cache import parse_cache
+from app.domains.curriculum.html_extractor import extract_elements, HTMLNode
 
 class CurriculumIngestor(BaseIngestor):
     def ingest(self, data_path: str) -> List[Document]:
@@ -25,25 +25,19 @@ class CurriculumIngestor(BaseIngestor):
             length_function=len
         )
 
-        for filename in os.listdir(full_path):
-            if not filename.lower().endswith(".pdf"):
-                continue
+        # 파일 순서를 고정해 chunk 순서가 실행마다 같도록 함
+        filenames = sorted(f for f in os.listdir(full_path) if f.lower().endswith(".pdf"))
 
+        for filename in filenames:
             file_path = os.path.join(full_path, filename)
             department = os.path.splitext(filename)[0]
             print(f"📄 Loading {filename} (department={department})")
 
-            # UpstageDocumentParseLoader 사용
-            loader = UpstageDocumentParseLoader(
-                file_path=file_path,
-                split="page"  # 페이지별로 분할
-            )
+            # PDF 내용이 같으면 Upstage를 다시 호출하지 않고 캐시된 페이지 HTML을 사용
+            with self.stage("parse"):
+                pages = parse_cache.load_pages(file_path, self._parse_with_upstage)
             
-            parsed_docs = loader.load()
-            
-            for page_num, doc in enumerate(parsed_docs):
-                page_content = doc.page_content
-                
+            for page_num, page_content in enumerate(pages):
                 # 순차적으로 내용 처리 (테이블과 텍스트를 원본 순서대로)
                 sequential_data = self._process_content_sequentially(
                     page_content, department, filename, page_num, chunk_index, splitter
@@ -53,11 +47,17 @@ class CurriculumIngestor(BaseIngestor):
 
         return docs
 
+    def _parse_with_upstage(self, file_path: str) -> List[str]:
+        """UpstageDocumentParseLoader로 페이지별 HTML 추출"""
+        loader = UpstageDocumentParseLoader(
+            file_path=file_path,
+            split="page"  # 페이지별로 분할
+        )
+        return [doc.page_content for doc in loader.load()]
+
     def _process_content_sequentially(self, html_content: str, department: str, filename: str, 
                                     page_num: int, start_chunk_index: int, splitter) -> dict:
         """HTML 내용을 원본 순서대로 처리하고 테이블 관련 텍스트를 합쳐서 저장"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
         # 디버깅용 플래그
         debug_mode = (department == "국방디지털융합학과")
         
@@ -65,7 +65,7 @@ class CurriculumIngestor(BaseIngestor):
             print(f"\n🔍 [DEBUG] Processing page {page_num} of {department}")
         
         # 1단계: 모든 요소를 순서대로 추출하고 분류
-        elements = self._extract_elements_sequentially(soup, debug_mode)
+        elements = self._extract_elements_sequentially(html_content, debug_mode)
         
         # 2단계: 테이블 주변 텍스트 병합
         merged_chunks = self._merge_table_with_context(elements, debug_mode)
@@ -144,35 +144,31 @@ class CurriculumIngestor(BaseIngestor):
             "next_chunk_index": chunk_index
         }
 
-    def _extract_elements_sequentially(self, soup: BeautifulSoup, debug_mode: bool) -> List[Dict[str, Any]]:
-        """HTML에서 요소들을 순서대로 추출하여 리스트로 반환"""
+    def _extract_elements_sequentially(self, html_content: str, debug_mode: bool) -> List[Dict[str, Any]]:
+        """HTML을 한 번 훑어 요소들을 순서대로 추출하여 리스트로 반환"""
+        parsed = extract_elements(html_content)
         elements = []
         
-        for element in soup.find_all(['table', 'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            if element.name == 'table':
-                markdown_table = self._convert_table_to_markdown(element)
+        for element in parsed.elements:
+            if element["type"] == "table":
+                markdown_table = self._convert_table_to_markdown(element["node"])
                 if markdown_table.strip():
                     elements.append({
                         "type": "table",
                         "content": markdown_table,
-                        "element": element,
+                        "element": element["node"],
                         "original_index": len(elements)
                     })
-                element.decompose()
             else:
-                text_content = element.get_text(strip=True)
-                if text_content and len(text_content) > 10:
-                    elements.append({
-                        "type": "text",
-                        "content": text_content,
-                        "element_tag": element.name,
-                        "original_index": len(elements)
-                    })
-                element.decompose()
+                elements.append({
+                    "type": "text",
+                    "content": element["content"],
+                    "element_tag": element["element_tag"],
+                    "original_index": len(elements)
+                })
         
         # 남은 텍스트 처리
-        remaining_text = soup.get_text(separator='\n', strip=True)
-        remaining_text = re.sub(r'\n\s*\n', '\n\n', remaining_text)
+        remaining_text = parsed.remaining_text()
         if remaining_text.strip():
             elements.append({
                 "type": "text",
@@ -192,6 +188,7 @@ class CurriculumIngestor(BaseIngestor):
         """테이블과 주변 텍스트를 병합"""
         merged_chunks = []
         used_indices = set()
+        table_count = 0
         
         for i, element in enumerate(elements):
             if element["type"] == "table" and i not in used_indices:
@@ -221,11 +218,12 @@ class CurriculumIngestor(BaseIngestor):
                     "table_content": element["content"],
                     "prev_text": prev_text,
                     "next_text": next_text,
-                    "table_index": len([c for c in merged_chunks if c["type"] == "table_with_context"]),
+                    "table_index": table_count,
                     "image_url": image_url
                 })
                 
                 used_indices.add(i)
+                table_count += 1
                 
                 if debug_mode:
                     print(f"🔗 [DEBUG] Merged table {i}:")
@@ -247,7 +245,7 @@ class CurriculumIngestor(BaseIngestor):
         
         return merged_chunks
 
-    def _convert_table_to_markdown(self, table) -> str:
+    def _convert_table_to_markdown(self, table: HTMLNode) -> str:
         """HTML 테이블을 마크다운 형식으로 변환"""
         rows = []
         
@@ -302,7 +300,7 @@ class CurriculumIngestor(BaseIngestor):
         
         return "\n".join(rows)
 
-    def _create_table_image(self, table, department: str, filename: str, page_num: int, tbl_idx: int) -> str:
+    def _create_table_image(self, table: HTMLNode, department: str, filename: str, page_num: int, tbl_idx: int) -> str:
         """테이블 이미지를 생성하고 S3에 업로드 (옵션 - 필요시 구현)"""
         # 현재는 빈 URL 반환, 필요시 실제 이미지 생성 로직 구현
         # 예: HTML to Image 라이브러리 사용하여 테이블 이미지 생성
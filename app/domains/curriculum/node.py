@@ -1,6 +1,10 @@
 from app.domains.curriculum.state import CurriculumState
 from app.vectorstore.qdrant import similarity_search
 from app.utils.document_formatter import format_curriculum_documents
+from app.utils.document_store import resolve_documents, to_refs
+from app.utils.document_grader import grade_documents_batch
+from app.agent.loop_budget import ANSWER_TAG, can_continue, record_candidate
+from app.utils.department_matcher import match_departments, SUPPORTED_DEPARTMENTS
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -19,9 +23,22 @@ class DepartmentExtracted(BaseModel):
     result: str  # "valid", "not_supported", "not_specific"
     department: str = ""
 
-def extract_department(state: CurriculumState) -> CurriculumState:
+async def extract_department(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] extract_department 진입")
     logger.info(f"[INPUT] question: {state['question']}")
+
+    if state.get("department_result"):
+        # gate 노드에서 학과를 이미 추출한 경우 LLM 호출 생략
+        departments = state.get("departments", [])
+        department = departments[0] if departments else ""
+        logger.info(f"[OUTPUT] (gate) result: {state['department_result']}, department: {department}")
+        return {"department": department}
+
+    match = match_departments(state["question"], multiple=False)
+    if match.result != "ambiguous":
+        department = match.departments[0] if match.departments else ""
+        logger.info(f"[OUTPUT] (local) result: {match.result}, department: {department}")
+        return {"department": department, "department_result": match.result}
     
     prompt = ChatPromptTemplate.from_messages([
         ("system", 
@@ -29,14 +46,14 @@ def extract_department(state: CurriculumState) -> CurriculumState:
         "- 특정 학과에 대한 질문이고 학과 리스트에 있다면: result='valid', department='학과명'\n"
         "- 특정 학과에 대한 질문이지만 학과 리스트에 없다면: result='not_supported', department='질문에 포함된 학과명'\n"
         "- 특정 학과에 대한 질문이 아니면: result='not_specific', department=''\n"
-        "학과 리스트: 소프트웨어학과, 디지털미디어학과, 국방디지털융합학과, 인공지능융합학과, 사이버보안학과"),
+        f"학과 리스트: {', '.join(SUPPORTED_DEPARTMENTS)}"),
         ("human", "{question}")
     ])
     chain = prompt | llm.with_structured_output(DepartmentExtracted)
-    result = chain.invoke({"question": state["question"]})
+    result = await chain.ainvoke({"question": state["question"]})
 
     logger.info(f"[OUTPUT] result: {result.result}, department: {result.department}")
-    return {**state, "department": result.department, "department_result": result.result}
+    return {"department": result.department, "department_result": result.result}
 
 def route_by_department_result(state: CurriculumState) -> str:
     return state["department_result"]
@@ -44,26 +61,23 @@ def route_by_department_result(state: CurriculumState) -> str:
 def not_supported_department(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] not_supported_department 진입")
     return {
-        **state,
         "generation": "죄송합니다. 현재 아주대학교에는 해당 학과가 존재하지 않아 안내드릴 수 없습니다."
     }
 
-def retrieve(state: CurriculumState) -> CurriculumState:
+async def retrieve(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] retrieve 진입")
     filters = {"metadata.department": state["department"]} if state["department"] else None
     logger.info(f"[INPUT] filters: {filters}")
 
-    hits = similarity_search(state["question"], domain="curriculum", k=5, metadata_filters=filters)
-    
-    formatted_docs = format_curriculum_documents(hits)
+    hits = await similarity_search(state["question"], domain="curriculum", k=5, metadata_filters=filters)
     
-    logger.info(f"[OUTPUT] {len(formatted_docs )} documents retrieved")
-    return {**state, "documents": formatted_docs}
+    logger.info(f"[OUTPUT] {len(hits)} documents retrieved")
+    return {"documents": to_refs(hits)}
 
 class GradeDocuments(BaseModel):
     binary_score: str = Field(description="Documents are relevant to the question, 'yes' or 'no'")
 
-def grade_documents(state: CurriculumState) -> CurriculumState:
+async def grade_documents(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] grade_documents 진입")
     structured_llm_grader = llm.with_structured_output(GradeDocuments)
 
@@ -82,24 +96,32 @@ def grade_documents(state: CurriculumState) -> CurriculumState:
 
     retrieval_grader = grade_prompt | structured_llm_grader
     question = state["question"]
-    documents = state["documents"]
+    hits = await resolve_documents(state["documents"])
+    documents = format_curriculum_documents(hits)
+
+    logger.info(f"[EVAL] {len(documents)}건 문서 평가 중...")
+    scores = await grade_documents_batch(retrieval_grader, llm, system, question, documents)
 
     filtered = []
-    for i, doc in enumerate(documents):
-        logger.info(f"[EVAL] Doc {i+1} 평가 중...")
-        result = retrieval_grader.invoke({"question": question, "document": doc})
-        logger.info(f"[RESULT] Doc {i+1}: {result.binary_score}")
-        if result.binary_score == "yes":
-            filtered.append(doc)
+    for i, (hit, score) in enumerate(zip(hits, scores)):
+        logger.info(f"[RESULT] Doc {i+1}: {score}")
+        if score == "yes":
+            filtered.append(hit)
 
     logger.info(f"[OUTPUT] {len(filtered)} documents passed relevance filter")
-    return {**state, "documents": filtered}
+    return {"documents": to_refs(filtered)}
 
 def decide_to_generate(state: CurriculumState) -> str:
     logger.info("[NODE] decide_to_generate 진입")
     if not state["documents"]:
+        if not can_continue(state, "transform_query"):
+            logger.info("[DECISION] No relevant documents, budget exhausted → give_up")
+            return "give_up"
         logger.info("[DECISION] No relevant documents → transform_query")
         return "transform_query"
+    if not can_continue(state, "generate"):
+        logger.info("[DECISION] Relevant documents found, budget exhausted → give_up")
+        return "give_up"
     logger.info("[DECISION] Relevant documents found → generate")
     return "generate"
 
@@ -111,15 +133,16 @@ def extract_all_image_urls(xml_docs: List[str]) -> List[str]:
         urls.extend([url.strip() for url in matches if url.strip()])
     return urls
 
-def generate(state: CurriculumState) -> CurriculumState:
+async def generate(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] generate 진입")
 
-    all_xml_content = "\n\n".join(state["documents"])
+    documents = format_curriculum_documents(await resolve_documents(state["documents"]))
+    all_xml_content = "\n\n".join(documents)
     system_msg = SystemMessage(content="다음 XML 형식의 학사 문서를 참고하여 질문에 답변을 생성하세요.")
     document_msg = HumanMessage(content=all_xml_content)
 
     image_msgs = []
-    for url in extract_all_image_urls(state["documents"]):
+    for url in extract_all_image_urls(documents):
         image_msgs.append(HumanMessage(content=[{
             "type": "image_url",
             "image_url": {"url": url}
@@ -129,17 +152,17 @@ def generate(state: CurriculumState) -> CurriculumState:
 
     messages = [system_msg, document_msg] + image_msgs + [question_msg]
 
-    response = llm.invoke(messages)
+    response = await llm.with_config(tags=[ANSWER_TAG]).ainvoke(messages)
     logger.info(f"[OUTPUT] Generation (first 200 chars): {response.content[:200]}")
-    return {**state, "generation": response.content}
+    return {"generation": response.content}
 
 class GenEval(BaseModel):
     binary_score: str
 
-def grade_generation_v_documents_and_question(state: CurriculumState) -> str:
+async def grade_generation_v_documents_and_question(state: CurriculumState) -> str:
     logger.info("[NODE] grade_generation_v_documents_and_question 진입")
     gen = state["generation"]
-    docs = state["documents"]
+    docs = format_curriculum_documents(await resolve_documents(state["documents"]))
     question = state["question"]
 
     doc_prompt = ChatPromptTemplate.from_messages([
@@ -149,11 +172,11 @@ def grade_generation_v_documents_and_question(state: CurriculumState) -> str:
         ("human", "Set of facts: \n\n {documents} \n\n LLM generation: {generation}")
     ])
     doc_chain = doc_prompt | llm.with_structured_output(GenEval)
-    doc_check = doc_chain.invoke({"generation": gen, "documents": "\n\n".join(docs)})
+    doc_check = await doc_chain.ainvoke({"generation": gen, "documents": "\n\n".join(docs)})
     logger.info(f"[EVAL] groundedness → {doc_check.binary_score}")
     
     if doc_check.binary_score != "yes":
-        logger.info("[DECISION] hallucination detected → regenerate")
+        logger.info("[EVAL] hallucination detected")
         return "hallucination"
     
     system = """You are a grader assessing whether an answer addresses / resolves a question \n 
@@ -164,21 +187,26 @@ def grade_generation_v_documents_and_question(state: CurriculumState) -> str:
         ("human", "User question: \n\n {question} \n\n LLM generation: {generation}")
     ])
     q_chain = q_prompt | llm.with_structured_output(GenEval)
-    q_check = q_chain.invoke({"question": question, "generation": gen})
+    q_check = await q_chain.ainvoke({"question": question, "generation": gen})
     logger.info(f"[EVAL] relevance to question → {q_check.binary_score}")
 
     return "relevant" if q_check.binary_score == "yes" else "not relevant"
 
+async def grade_generation(state: CurriculumState) -> CurriculumState:
+    """생성된 답변을 평가하고, 지금까지의 최선 답변을 갱신"""
+    grade = await grade_generation_v_documents_and_question(state)
+    return {"generation_grade": grade, **record_candidate(state, grade)}
+
 class Rewritten(BaseModel):
     question: str
 
-def transform_query(state: CurriculumState) -> CurriculumState:
+async def transform_query(state: CurriculumState) -> CurriculumState:
     logger.info("[NODE] transform_query 진입")
     prompt = ChatPromptTemplate.from_messages([
         ("system", "질문을 더 명확하게 한국어로 재작성해주세요."),
         ("human", "{question}")
     ])
     chain = prompt | llm.with_structured_output(Rewritten)
-    better_question = chain.invoke({"question": state["question"]})
+    better_question = await chain.ainvoke({"question": state["question"]})
     logger.info(f"[OUTPUT] transformed question: {better_question.question}")
-    return {**state, "question": better_question.question}
\ No newline at end of file
+    return {"question": better_question.question}
\ No newline at end of file
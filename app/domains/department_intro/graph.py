@@ -1,14 +1,17 @@
 from langgraph.graph import END, StateGraph
 from app.domains.department_intro.state import DepartmentIntroState
 from app.domains.department_intro.node import *
+from app.agent.loop_budget import give_up, route_generation, tracked
 
 workflow = StateGraph(DepartmentIntroState)
 workflow.add_node("extract_department", extract_department)
 workflow.add_node("not_supported_department", not_supported_department)
-workflow.add_node("retrieve", retrieve)
-workflow.add_node("grade_documents", grade_documents)
-workflow.add_node("generate", generate)
-workflow.add_node("transform_query", transform_query)
+workflow.add_node("retrieve", tracked("retrieve", retrieve))
+workflow.add_node("grade_documents", tracked("grade_documents", grade_documents))
+workflow.add_node("generate", tracked("generate", generate))
+workflow.add_node("transform_query", tracked("transform_query", transform_query))
+workflow.add_node("grade_generation", tracked("grade_generation", grade_generation))
+workflow.add_node("give_up", tracked("give_up", give_up))
 
 workflow.set_entry_point("extract_department")
 
@@ -28,17 +31,23 @@ workflow.add_conditional_edges(
     decide_to_generate,
     {
         "generate": "generate",
-        "transform_query": "transform_query"
+        "transform_query": "transform_query",
+        "give_up": "give_up"
     }
 )
 workflow.add_edge("transform_query", "retrieve")
+workflow.add_edge("generate", "grade_generation")
+
+# 재생성 / 재작성 루프는 요청별 시간·횟수 예산 안에서만 반복하고, 소진되면 give_up에서 최선의 답변 반환
 workflow.add_conditional_edges(
-    "generate",
-    grade_generation_v_documents_and_question,
+    "grade_generation",
+    route_generation,
     {
         "hallucination": "generate",
         "relevant": END,
-        "not relevant": "transform_query"
+        "not relevant": "transform_query",
+        "give_up": "give_up"
     }
 )
+workflow.add_edge("give_up", END)
 department_intro_app = workflow.compile()
\ No newline at end of file
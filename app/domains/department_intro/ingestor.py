@@ -1,9 +1,9 @@
 import os
 from typing import List
-from langchain_community.document_loaders import PDFPlumberLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from app.domains.base_ingestor import BaseIngestor
+from app.utils.pdf_parser import load_pdf_pages
 
 class DepartmentIntroIngestor(BaseIngestor):
     def ingest(self, data_path: str) -> List[Document]:
@@ -20,17 +20,16 @@ class DepartmentIntroIngestor(BaseIngestor):
             length_function=len
         )
 
-        for filename in os.listdir(full_path):
-            if not filename.lower().endswith(".pdf"):
-                continue
+        # 파일 순서를 고정해 chunk 순서가 실행마다 같도록 함
+        filenames = sorted(f for f in os.listdir(full_path) if f.lower().endswith(".pdf"))
+        with self.stage("parse"):
+            parsed = load_pdf_pages([os.path.join(full_path, filename) for filename in filenames])
 
-            path = os.path.join(full_path, filename)
+        for filename, pages in zip(filenames, parsed):
             department = os.path.splitext(filename)[0]
-            print(f"📄 Loading {filename} (department={department})")
+            print(f"📄 Loaded {filename} (department={department}, pages={len(pages)})")
 
-            loader = PDFPlumberLoader(path)
-            pages = loader.load()
-            full_text = "\n".join(p.page_content for p in pages)
+            full_text = "\n".join(pages)
 
             chunks = splitter.split_text(full_text)
             for idx, chunk in enumerate(chunks):
@@ -27,7 +27,7 @@ class EmploymentStatusIngestor(BaseIngestor):
             department = os.path.splitext(filename)[0]
             print(f"📄 Loading {filename} (department={department})")
 
-            with open(path, encoding="utf-8") as f:
+            with self.stage("parse"), open(path, encoding="utf-8") as f:
                 text = f.read().strip()
 
             if not text:
@@ -1,9 +1,15 @@
-from typing import List
+from typing import Dict, List
 from typing_extensions import TypedDict, Annotated
 
 class EmploymentStatusState(TypedDict):
     question: Annotated[str, "User query"]
     generation: Annotated[str, "LLM-generated answer"]
-    documents: Annotated[List[str], "Retrieved and filtered documents"]
+    documents: Annotated[List[Dict], "Refs (id, score) of retrieved and filtered documents"]
     department: Annotated[str, "Department extracted from user query"]
-    department_result: Annotated[str, "Result of department check"]
\ No newline at end of file
+    department_result: Annotated[str, "Result of department check"]
+    departments: Annotated[List[str], "Departments pre-extracted by the gate node"]
+    deadline: Annotated[float, "Epoch seconds after which no new loop iteration starts"]
+    loop: Annotated[Dict, "Calls / seconds per loop node in this request"]
+    generation_grade: Annotated[str, "Grade of the latest generation"]
+    best_generation: Annotated[str, "Best-graded generation so far"]
+    best_grade: Annotated[str, "Grade of best_generation"]
\ No newline at end of file
@@ -1,28 +1,31 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.domains.user.model import User
 from app.domains.user.schema import SignupRequest
-from app.config.database import get_db
-from app.utils.auth import hash_password
-from sqlalchemy.orm import Session
-from langgraph_checkpoint_aws.saver import BedrockSessionSaver
-import os
+from app.utils.password_hasher import password_hasher
+from app.utils.session_provider import session_provider
 
-def get_user_by_email(email: str, db: Session):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(email: str, db: AsyncSession):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def create_user(request: SignupRequest, db: AsyncSession):
+    # bcrypt 해시는 전용 프로세스 풀, 대화 세션은 미리 만들어 둔 pool에서 가져옴
+    hashed_password = await password_hasher.hash(request.password)
+    session_id = await session_provider.acquire()
 
-def create_user(request: SignupRequest, db: Session):
-    
-    saver = BedrockSessionSaver(region_name=os.getenv("AWS_REGION"))
-    session = saver.session_client.create_session()
-    session_id = session.session_id
-    
     new_user = User(
         email=request.email,
-        hashed_password=hash_password(request.password),
+        hashed_password=hashed_password,
         name=request.name,
         bedrock_session_id=session_id
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except Exception:
+        # 가입에 실패하면 세션은 다음 가입에 다시 사용
+        session_provider.release(session_id)
+        raise
+    await db.refresh(new_user)
     return new_user
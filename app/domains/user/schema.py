@@ -16,4 +16,9 @@ class LoginRequest(BaseModel):
 
 class LoginResponse(BaseModel):
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    token_type: str = "bearer"
+
+class AuthenticatedUser(BaseModel):
+    """요청 처리에 필요한 인증 사용자 정보 (토큰 claim 또는 캐시에서 구성, DB 조회 없이 사용)"""
+    id: int
+    bedrock_session_id: str
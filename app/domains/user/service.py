@@ -1,22 +1,37 @@
 from app.domains.user.schema import SignupRequest, SignupResponse, LoginRequest, LoginResponse
 from app.domains.user.model import User
 from app.domains.user.repository import create_user, get_user_by_email
-from app.utils.auth import verify_password, create_jwt_token
-from sqlalchemy.orm import Session
+from app.utils.auth import create_jwt_token
+from app.utils.password_hasher import password_hasher
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-def signup_user(request: SignupRequest, db: Session) -> SignupResponse:
-    existing = get_user_by_email(request.email, db)
+async def signup_user(request: SignupRequest, db: AsyncSession) -> SignupResponse:
+    existing = await get_user_by_email(request.email, db)
     if existing:
         raise HTTPException(status_code=400, detail="⚠이미 가입된 이메일입니다.")
-    
-    user = create_user(request, db)
+    # 세션 생성 / bcrypt 해시를 기다리는 동안 커넥션을 풀에 돌려둠
+    await db.rollback()
+
+    user = await create_user(request, db)
     return SignupResponse(id=user.id, email=user.email, name=user.name)
 
-def login_user(request: LoginRequest, db: Session) -> LoginResponse:
-    user = get_user_by_email(request.email, db)
-    if not user or not verify_password(request.password, user.hashed_password):
+async def login_user(request: LoginRequest, db: AsyncSession) -> LoginResponse:
+    user = await get_user_by_email(request.email, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="⚠인증 정보가 유효하지 않습니다.")
+    user_id, session_id, hashed_password = user.id, user.bedrock_session_id, user.hashed_password
+    # bcrypt 검증 대기 중에는 커넥션을 풀에 돌려둠
+    await db.rollback()
+
+    verified, new_hash = await password_hasher.verify_and_update(request.password, hashed_password)
+    if not verified:
         raise HTTPException(status_code=401, detail="⚠인증 정보가 유효하지 않습니다.")
-    
-    token = create_jwt_token(user_id=user.id)
+    if new_hash:
+        # BCRYPT_ROUNDS가 바뀐 뒤 첫 로그인: 새 cost로 다시 해시해 저장
+        await db.execute(update(User).where(User.id == user_id).values(hashed_password=new_hash))
+        await db.commit()
+
+    token = create_jwt_token(user_id=user_id, session_id=session_id)
     return LoginResponse(access_token=token)
\ No newline at end of file
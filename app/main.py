@@ -1,9 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from langgraph.errors import GraphRecursionError
 from app.api import user_router, chat_router, data_router
 from app.api.chat_router import handle_graph_recursion_error
+from app.agent.graph import checkpointer
+from app.utils.password_hasher import password_hasher
+from app.utils.session_provider import session_provider
 
-app = FastAPI(title="Ajou Major Mate", version="1.0.0", debug=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 가입 시 바로 배정할 대화 세션을 미리 만들어 둠
+    session_provider.start()
+    yield
+    # write-behind로 저장 중인 대화 상태를 마저 기록
+    await checkpointer.aclose()
+    await session_provider.close()
+    # 비밀번호 해시용 spawn 워커 프로세스 종료 (reload 시 남지 않도록)
+    password_hasher.shutdown()
+
+app = FastAPI(title="Ajou Major Mate", version="1.0.0", debug=True, lifespan=lifespan)
 
 app.add_exception_handler(GraphRecursionError, handle_graph_recursion_error)
 
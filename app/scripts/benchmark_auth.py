@@ -0,0 +1,149 @@
+"""
+인증 의존성(get_current_user)의 요청당 오버헤드 부하 테스트
+
+    python -m app.scripts.benchmark_auth --requests 2000 --concurrency 32
+
+DATABASE_LOCAL_URL(ENVIRONMENT=production이면 DATABASE_URL) DB에 임시 사용자를 만들고,
+인증만 거치는 빈 엔드포인트를 ASGI로 직접 호출해 다음 세 가지를 비교한다. 임시 사용자는 종료 시 삭제한다.
+- legacy: 변경 전 방식 (동기 get_db 세션 + 요청마다 User 조회, threadpool에서 실행)
+- cache: session id claim이 없는 기존 토큰 → TTL 사용자 캐시
+- claims: session id claim이 있는 토큰 → DB 조회 없음
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from jose import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from app.config.database import DATABASE_URL, engine
+from app.domains.user.model import Base, User
+from app.utils import auth
+
+
+# 변경 전의 동기 엔진 / 세션 (기본 풀 설정)
+legacy_engine = create_engine(DATABASE_URL)
+LegacySessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=legacy_engine)
+
+
+def legacy_get_db():
+    db = LegacySessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def legacy_get_current_user(request: Request, db: Session = Depends(legacy_get_db)):
+    """변경 전 get_current_user (비교 기준)"""
+    token = request.headers.get("Authorization", "").split(" ")[-1]
+    try:
+        payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="⚠ 유효하지 않은 토큰입니다.")
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="❌ 유저를 찾을 수 없습니다.")
+    return user
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy(user=Depends(legacy_get_current_user)):
+        return {"sid": user.bedrock_session_id}
+
+    @app.get("/current")
+    async def current(user=Depends(auth.get_current_user)):
+        return {"sid": user.bedrock_session_id}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, token: str, requests: int, concurrency: int) -> Dict[str, float]:
+    timings: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "mean": statistics.mean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "rps": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="auth dependency overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=legacy_engine, tables=[User.__table__])
+    queries = {"count": 0}
+
+    def count_queries(*_):
+        queries["count"] += 1
+
+    for target in (legacy_engine, engine.sync_engine):
+        event.listen(target, "before_cursor_execute", count_queries)
+
+    db = LegacySessionLocal()
+    user = User(
+        email=f"bench-auth-{uuid.uuid4().hex[:12]}@example.com", hashed_password="-",
+        name="bench", bedrock_session_id=str(uuid.uuid4())
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    app = build_app()
+    cases = {
+        "legacy": ("/legacy", auth.create_jwt_token(user.id)),
+        "cache": ("/current", auth.create_jwt_token(user.id)),
+        "claims": ("/current", auth.create_jwt_token(user.id, session_id=user.bedrock_session_id)),
+    }
+    print(f"\n📊 requests={args.requests}, concurrency={args.concurrency}, db={legacy_engine.url.get_backend_name()}\n")
+    print(f"{'case':<8} {'mean(ms)':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'req/s':>9} {'queries':>8}")
+    try:
+        for name, (path, token) in cases.items():
+            auth.user_cache.clear()
+            # 워밍업 (커넥션 풀 / 캐시 채우기)
+            asyncio.run(run(app, path, token, args.concurrency, args.concurrency))
+            queries["count"] = 0
+            result = asyncio.run(run(app, path, token, args.requests, args.concurrency))
+            print(
+                f"{name:<8} {result['mean']:>9.2f} {result['p50']:>9.2f} {result['p95']:>9.2f} "
+                f"{result['rps']:>9.0f} {queries['count']:>8}"
+            )
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
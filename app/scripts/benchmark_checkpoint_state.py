@@ -0,0 +1,95 @@
+"""
+chat 1회당 checkpoint 크기 / 직렬화 시간 측정: 문서 본문을 state에 담을 때(by value)와 참조만 담을 때(by ref)
+
+    python -m app.scripts.benchmark_checkpoint_state
+    python -m app.scripts.benchmark_checkpoint_state --question "소프트웨어학과 SCE101 몇 학년 과목이야?" --repeat 3
+
+질문마다 그래프를 메모리 checkpointer로 실행한 뒤 저장된 checkpoint를 그대로 직렬화(by ref)하고,
+documents 채널의 참조를 이전 방식의 XML 문서 본문으로 되돌려 다시 직렬화(by value)해 비교한다.
+OPENAI_API_KEY와 적재된 Qdrant 컬렉션이 필요하다.
+"""
+import argparse
+import asyncio
+import copy
+import statistics
+import time
+import uuid
+from typing import Dict, List
+from langgraph.checkpoint.memory import InMemorySaver
+from app.agent.checkpointer import MeteredCheckpointer
+from app.agent.graph import workflow
+from app.utils.document_formatter import format_curriculum_documents, format_documents
+from app.utils.document_store import document_scope, resolve_documents
+
+DEFAULT_QUESTIONS = [
+    "소프트웨어학과 SCE101 과목은 몇 학년 때 들어?",
+    "소프트웨어학과 교육과정 알려줘",
+    "사이버보안학과는 어떤 학과야?",
+    "디지털미디어학과 졸업생 취업 현황 알려줘",
+]
+
+
+async def _by_value(checkpoint: Dict, checkpoint_ns: str) -> Dict:
+    """documents 채널의 참조를 변경 전처럼 포맷된 문서 본문으로 바꾼 checkpoint"""
+    refs = checkpoint["channel_values"].get("documents")
+    if not refs:
+        return checkpoint
+    formatter = format_curriculum_documents if checkpoint_ns.startswith("curriculum") else format_documents
+    expanded = copy.copy(checkpoint)
+    expanded["channel_values"] = {**checkpoint["channel_values"], "documents": formatter(await resolve_documents(refs))}
+    return expanded
+
+
+def _serialize(saver: InMemorySaver, checkpoints: List[Dict]) -> Dict[str, float]:
+    start = time.perf_counter()
+    size = sum(len(saver.serde.dumps_typed(checkpoint)[1]) for checkpoint in checkpoints)
+    return {"bytes": size, "serialize_ms": (time.perf_counter() - start) * 1000}
+
+
+async def measure(question: str) -> Dict[str, Dict[str, float]]:
+    backend = InMemorySaver()
+    graph = workflow.compile(checkpointer=MeteredCheckpointer(backend, write_behind=False))
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 10}
+
+    with document_scope():
+        await graph.ainvoke({"question": question}, config)
+        by_ref, by_value = [], []
+        async for checkpoint_tuple in backend.alist(None):
+            checkpoint_ns = checkpoint_tuple.config["configurable"]["checkpoint_ns"]
+            by_ref.append(checkpoint_tuple.checkpoint)
+            by_value.append(await _by_value(checkpoint_tuple.checkpoint, checkpoint_ns))
+
+    return {
+        "checkpoints": len(by_ref),
+        "by_value": _serialize(backend, by_value),
+        "by_ref": _serialize(backend, by_ref),
+    }
+
+
+async def main_async(args):
+    questions = args.question or DEFAULT_QUESTIONS
+    print(f"\n📊 {len(questions)} questions, repeat={args.repeat}\n")
+    print(f"{'question':<32} {'ckpts':>6} {'value KB':>9} {'ref KB':>8} {'value ms':>9} {'ref ms':>8} {'size':>6}")
+
+    for question in questions:
+        runs = [await measure(question) for _ in range(args.repeat)]
+        value_bytes = statistics.mean(run["by_value"]["bytes"] for run in runs)
+        ref_bytes = statistics.mean(run["by_ref"]["bytes"] for run in runs)
+        value_ms = statistics.mean(run["by_value"]["serialize_ms"] for run in runs)
+        ref_ms = statistics.mean(run["by_ref"]["serialize_ms"] for run in runs)
+        label = question if len(question) <= 30 else question[:29] + "…"
+        print(
+            f"{label:<32} {runs[0]['checkpoints']:>6} {value_bytes / 1024:>9.1f} {ref_bytes / 1024:>8.1f} "
+            f"{value_ms:>9.2f} {ref_ms:>8.2f} {ref_bytes / value_bytes if value_bytes else 1:>5.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="graph state checkpoint size benchmark")
+    parser.add_argument("--question", action="append", help="측정할 질문 (여러 번 지정 가능)")
+    parser.add_argument("--repeat", type=int, default=1)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
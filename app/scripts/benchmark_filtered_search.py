@@ -0,0 +1,139 @@
+"""
+payload 인덱스 유무에 따른 필터 검색 지연시간 비교
+
+    python -m app.scripts.benchmark_filtered_search --scale 10 --queries 200
+    python -m app.scripts.benchmark_filtered_search --points 30000 --tenant
+
+현재 컬렉션 point 수의 --scale배(또는 --points개) 만큼 무작위 벡터를 별도 벤치마크 컬렉션에 적재하고,
+실제 검색과 같은 metadata.domain (+ metadata.department) 필터로 query_points를 실행한다.
+인덱스 없이 한 번, domain/department keyword 인덱스를 만든 뒤 한 번 측정해 p50/p95를 비교한다.
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+import numpy as np
+from qdrant_client import models
+from app.vectorstore import qdrant
+from app.utils.department_matcher import SUPPORTED_DEPARTMENTS
+
+DOMAINS = ["course", "curriculum", "department_intro", "employment_status"]
+UPLOAD_BATCH_SIZE = 256
+
+
+def random_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(collection: str, points: int, dim: int, rng: np.random.Generator):
+    client = qdrant.client
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(
+        collection_name=collection,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+    )
+    for start in range(0, points, UPLOAD_BATCH_SIZE):
+        count = min(UPLOAD_BATCH_SIZE, points - start)
+        vectors = random_vectors(count, dim, rng)
+        client.upsert(
+            collection_name=collection,
+            points=[
+                models.PointStruct(
+                    id=start + i,
+                    vector=vectors[i].tolist(),
+                    payload={
+                        "page_content": "",
+                        "metadata": {
+                            "domain": DOMAINS[(start + i) % len(DOMAINS)],
+                            "department": SUPPORTED_DEPARTMENTS[(start + i) // len(DOMAINS) % len(SUPPORTED_DEPARTMENTS)],
+                        },
+                    },
+                )
+                for i in range(count)
+            ],
+            wait=True,
+        )
+
+
+def wait_until_indexed(collection: str, timeout: float = 600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if qdrant.client.get_collection(collection).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def measure(collection: str, queries: int, dim: int, rng: np.random.Generator) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(queries):
+        conditions = [models.FieldCondition(key="metadata.domain", match=models.MatchValue(value=random.choice(DOMAINS)))]
+        if random.random() < 0.5:
+            conditions.append(models.FieldCondition(
+                key="metadata.department", match=models.MatchValue(value=random.choice(SUPPORTED_DEPARTMENTS))
+            ))
+        vector = random_vectors(1, dim, rng)[0].tolist()
+        start = time.perf_counter()
+        qdrant.client.query_points(
+            collection_name=collection,
+            query=vector,
+            query_filter=models.Filter(must=conditions),
+            limit=5,
+            with_payload=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.mean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="filtered search latency benchmark")
+    parser.add_argument("--scale", type=int, default=10, help="현재 컬렉션 크기의 몇 배로 적재할지")
+    parser.add_argument("--points", type=int, default=0, help="적재할 point 수 (지정 시 --scale 무시)")
+    parser.add_argument("--min-points", type=int, default=20000, help="현재 컬렉션이 비어 있을 때 사용할 point 수")
+    parser.add_argument("--dim", type=int, default=qdrant.VECTOR_SIZE)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--tenant", action="store_true", help="domain 인덱스를 tenant 인덱스로 생성")
+    parser.add_argument("--keep", action="store_true", help="측정 후 벤치마크 컬렉션을 지우지 않음")
+    args = parser.parse_args()
+
+    collection = f"{qdrant.COLLECTION_NAME}_bench"
+    points = args.points
+    if not points:
+        current = qdrant.client.count(qdrant.COLLECTION_NAME).count if qdrant.client.collection_exists(qdrant.COLLECTION_NAME) else 0
+        points = current * args.scale or args.min_points
+
+    rng = np.random.default_rng(0)
+    random.seed(0)
+    print(f"\n📊 {points} points, dim={args.dim}, queries={args.queries}, tenant={args.tenant}\n")
+
+    try:
+        populate(collection, points, args.dim, rng)
+        wait_until_indexed(collection)
+        before = measure(collection, args.queries, args.dim, rng)
+
+        for field, is_tenant in qdrant.PAYLOAD_INDEX_FIELDS.items():
+            qdrant.client.create_payload_index(
+                collection, field_name=field,
+                field_schema=qdrant._index_params(args.tenant if field == "metadata.domain" else is_tenant)
+            )
+        wait_until_indexed(collection)
+        after = measure(collection, args.queries, args.dim, rng)
+    finally:
+        if not args.keep and qdrant.client.collection_exists(collection):
+            qdrant.client.delete_collection(collection)
+
+    print(f"{'':<14} {'mean(ms)':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for name, result in (("no index", before), ("keyword index", after)):
+        print(f"{name:<14} {result['mean']:>9.2f} {result['p50']:>9.2f} {result['p95']:>9.2f}")
+    print(f"\np95 speedup: {before['p95'] / after['p95']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
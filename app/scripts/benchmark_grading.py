@@ -0,0 +1,65 @@
+"""
+문서 평가(grade_documents) 모드별 지연시간 비교
+
+    python -m app.scripts.benchmark_grading --num-docs 10 --repeat 3
+
+고정된 문서 집합(employment_status 데이터의 앞 N개 청크)에 대해 실제 grade_documents 노드를
+serial / concurrent / single_call 모드로 실행하고 소요 시간과 통과 문서 수를 비교한다.
+OPENAI_API_KEY가 필요하다.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+from app.domains.employment_status import node
+from app.domains.employment_status.ingestor import EmploymentStatusIngestor
+from app.utils import document_grader
+from app.utils.document_store import to_refs
+
+MODES = ["serial", "concurrent", "single_call"]
+DEFAULT_QUESTION = "소프트웨어학과 졸업생들은 주로 어떤 분야로 취업하나요?"
+
+
+def load_fixed_documents(num_docs: int) -> List[Dict]:
+    docs = EmploymentStatusIngestor().ingest(data_path="scripts/employment_status/data")
+    docs.sort(key=lambda doc: (doc.metadata["source_file"], doc.metadata["chunk_index"]))
+    hits = [{"text": doc.page_content, "metadata": doc.metadata} for doc in docs[:num_docs]]
+    # grade_documents는 state의 문서 참조를 캐시에서 본문으로 되돌려 평가함
+    return to_refs(hits)
+
+
+async def run_mode(mode: str, question: str, documents: List[Dict], repeat: int):
+    document_grader.GRADING_MODE = mode
+    timings = []
+    passed = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await node.grade_documents({"question": question, "documents": documents})
+        timings.append(time.perf_counter() - start)
+        passed = len(result["documents"])
+    return timings, passed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="grade_documents latency benchmark")
+    parser.add_argument("--num-docs", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--question", default=DEFAULT_QUESTION)
+    args = parser.parse_args()
+
+    documents = load_fixed_documents(args.num_docs)
+    print(f"\n📊 {len(documents)} documents, repeat={args.repeat}, "
+          f"max_concurrency={document_grader.GRADING_MAX_CONCURRENCY}\n")
+
+    baseline = None
+    print(f"{'mode':<12} {'mean(s)':>8} {'min(s)':>8} {'max(s)':>8} {'passed':>7} {'speedup':>8}")
+    for mode in MODES:
+        timings, passed = await run_mode(mode, args.question, documents, args.repeat)
+        mean = statistics.mean(timings)
+        baseline = baseline or mean
+        print(f"{mode:<12} {mean:>8.2f} {min(timings):>8.2f} {max(timings):>8.2f} {passed:>7} {baseline / mean:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
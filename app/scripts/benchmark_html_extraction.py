@@ -0,0 +1,144 @@
+"""
+커리큘럼 페이지 HTML 요소 추출 속도 비교 + 기존 구현과의 결과 동일성 검사
+
+    python -m app.scripts.benchmark_html_extraction --repeat 5
+    python -m app.scripts.benchmark_html_extraction --html-dir path/to/pages
+
+기본적으로 curriculum PDF의 Upstage parse 캐시(python -m app.scripts.parse_cache warm)에서 페이지 HTML을 읽는다.
+BeautifulSoup find_all + decompose 방식(legacy)과 단일 패스 스트리밍 방식(stream)으로
+_process_content_sequentially 전체를 실행해 페이지당 시간을 비교하고, 두 방식의 청크가 모두 같은지 확인한다.
+결과가 하나라도 다르면 종료 코드 1을 반환한다.
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+from bs4 import BeautifulSoup
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.domains.curriculum.ingestor import CurriculumIngestor
+from app.utils.parse_cache import parse_cache, file_sha256
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "curriculum", "data")
+
+
+class LegacyCurriculumIngestor(CurriculumIngestor):
+    """변경 전 BeautifulSoup 기반 요소 추출 (비교 기준)"""
+
+    def _extract_elements_sequentially(self, html_content: str, debug_mode: bool) -> List[Dict[str, Any]]:
+        soup = BeautifulSoup(html_content, 'html.parser')
+        elements = []
+
+        for element in soup.find_all(['table', 'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            if element.name == 'table':
+                markdown_table = self._convert_table_to_markdown(element)
+                if markdown_table.strip():
+                    elements.append({
+                        "type": "table",
+                        "content": markdown_table,
+                        "element": element,
+                        "original_index": len(elements)
+                    })
+                element.decompose()
+            else:
+                text_content = element.get_text(strip=True)
+                if text_content and len(text_content) > 10:
+                    elements.append({
+                        "type": "text",
+                        "content": text_content,
+                        "element_tag": element.name,
+                        "original_index": len(elements)
+                    })
+                element.decompose()
+
+        remaining_text = soup.get_text(separator='\n', strip=True)
+        remaining_text = re.sub(r'\n\s*\n', '\n\n', remaining_text)
+        if remaining_text.strip():
+            elements.append({
+                "type": "text",
+                "content": remaining_text,
+                "element_tag": "remaining",
+                "original_index": len(elements)
+            })
+        return elements
+
+    def _merge_table_with_context(self, elements, debug_mode):
+        merged_chunks = super()._merge_table_with_context(elements, debug_mode)
+        for position, chunk in enumerate(merged_chunks):
+            if chunk["type"] == "table_with_context":
+                chunk["table_index"] = len([c for c in merged_chunks[:position] if c["type"] == "table_with_context"])
+        return merged_chunks
+
+
+def load_pages(html_dir: str) -> List[Tuple[str, int, str]]:
+    """(파일명, 페이지 번호, HTML) 목록"""
+    pages = []
+    if html_dir:
+        for filename in sorted(os.listdir(html_dir)):
+            if filename.lower().endswith(".html"):
+                with open(os.path.join(html_dir, filename), encoding="utf-8") as f:
+                    pages.append((filename, 0, f.read()))
+        return pages
+
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        cached = parse_cache.get(file_sha256(os.path.join(DATA_DIR, filename)))
+        if cached is None:
+            raise SystemExit(f"⚠️ {filename} is not in the parse cache. Run `python -m app.scripts.parse_cache warm` first.")
+        pages += [(filename, page_num, html) for page_num, html in enumerate(cached)]
+    return pages
+
+
+def run(ingestor: CurriculumIngestor, pages: List[Tuple[str, int, str]]) -> List[List[Tuple[str, Dict]]]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100, length_function=len)
+    outputs = []
+    for filename, page_num, html in pages:
+        # 디버그 출력이 측정에 섞이지 않도록 debug_mode가 꺼지는 학과명을 사용
+        result = ingestor._process_content_sequentially(html, "benchmark", filename, page_num, 0, splitter)
+        outputs.append([
+            (doc.page_content, {k: v for k, v in doc.metadata.items() if k != "image_url"})
+            for doc in result["documents"]
+        ])
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="curriculum HTML element extraction benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--html-dir", default="")
+    args = parser.parse_args()
+
+    pages = load_pages(args.html_dir)
+    total_bytes = sum(len(html.encode("utf-8")) for _, _, html in pages)
+    print(f"\n📊 {len(pages)} pages ({total_bytes / 1024:.0f} KiB), repeat={args.repeat}\n")
+
+    implementations = {"legacy": LegacyCurriculumIngestor(), "stream": CurriculumIngestor()}
+    outputs = {}
+    baseline = None
+    print(f"{'impl':<8} {'mean(s)':>8} {'min(s)':>8} {'ms/page':>8} {'speedup':>8}")
+    for name, ingestor in implementations.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[name] = run(ingestor, pages)
+            timings.append(time.perf_counter() - start)
+        mean = statistics.mean(timings)
+        baseline = baseline or mean
+        print(f"{name:<8} {mean:>8.3f} {min(timings):>8.3f} {mean / len(pages) * 1000:>8.2f} {baseline / mean:>7.1f}x")
+
+    mismatched = [
+        f"{filename} p{page_num}"
+        for (filename, page_num, _), legacy, stream in zip(pages, outputs["legacy"], outputs["stream"])
+        if legacy != stream
+    ]
+    if mismatched:
+        print(f"\n❌ {len(mismatched)} pages differ: {', '.join(mismatched[:10])}")
+        raise SystemExit(1)
+    chunks = sum(len(page) for page in outputs["stream"])
+    print(f"\n✅ legacy / stream 결과 일치 ({chunks} chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+로그인(bcrypt 검증) 처리량 측정: 코어당 초당 로그인 수 + 로그인 폭주 중 이벤트 루프 지연
+
+    python -m app.scripts.benchmark_password_hashing --logins 64 --workers 1,2,4
+    python -m app.scripts.benchmark_password_hashing --rounds 10
+
+- threadpool: 변경 전 방식 (FastAPI 기본 스레드풀에서 verify)
+- process xN: PasswordHasher 전용 프로세스 풀 (워커 N개)
+로그인을 한꺼번에 요청하는 동안 10ms 주기 타이머의 지연(loop lag)을 함께 측정해
+같은 프로세스의 채팅 요청이 얼마나 밀리는지 비교한다.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List
+from fastapi.concurrency import run_in_threadpool
+from app.utils.password_hasher import BCRYPT_ROUNDS, PasswordHasher, create_context
+
+PASSWORD = "benchmark-password"
+TICK_SECONDS = 0.01
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: List[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def storm(verify: Callable[[], Awaitable], logins: int) -> Dict[str, float]:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    assert all(results), "verification failed"
+    lags.sort()
+    return {
+        "logins_per_second": logins / elapsed,
+        "lag_p95_ms": lags[min(len(lags) - 1, int(len(lags) * 0.95))] if lags else 0.0,
+        "lag_max_ms": lags[-1] if lags else 0.0,
+    }
+
+
+async def main_async(args):
+    context = create_context(args.rounds)
+    hashed = context.hash(PASSWORD)
+    cores = os.cpu_count() or 1
+    print(f"\n📊 logins={args.logins}, rounds={args.rounds}, cpu_count={cores}\n")
+    print(f"{'mode':<14} {'logins/s':>9} {'per core':>9} {'lag p95(ms)':>12} {'lag max(ms)':>12}")
+
+    async def threadpool_verify():
+        return await run_in_threadpool(context.verify, PASSWORD, hashed)
+
+    result = await storm(threadpool_verify, args.logins)
+    # 스레드풀은 모든 코어를 쓸 수 있으므로 전체 코어 수로 나눔
+    print(
+        f"{'threadpool':<14} {result['logins_per_second']:>9.1f} {result['logins_per_second'] / cores:>9.1f} "
+        f"{result['lag_p95_ms']:>12.2f} {result['lag_max_ms']:>12.2f}"
+    )
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        hasher = PasswordHasher(workers=workers, max_queue=args.logins, rounds=args.rounds)
+
+        async def process_verify():
+            verified, _ = await hasher.verify_and_update(PASSWORD, hashed)
+            return verified
+
+        try:
+            # 워커 프로세스 기동 시간은 제외
+            await asyncio.gather(*(process_verify() for _ in range(workers)))
+            result = await storm(process_verify, args.logins)
+        finally:
+            hasher.shutdown()
+        per_core = result["logins_per_second"] / min(workers, cores)
+        print(
+            f"{f'process x{workers}':<14} {result['logins_per_second']:>9.1f} {per_core:>9.1f} "
+            f"{result['lag_p95_ms']:>12.2f} {result['lag_max_ms']:>12.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt login throughput benchmark")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+PDF 파싱 모드별 처리 시간 비교
+
+    python -m app.scripts.benchmark_pdf_parsing --domains course department_intro --repeat 3
+
+scripts/{domain}/data 의 PDF를 serial(기존 PDFPlumberLoader 순차 루프) / process(프로세스 풀) 모드로
+파싱해 wall-clock 시간과 초당 페이지 수를 비교하고, 두 모드의 추출 결과가 같은지 확인한다.
+process 모드의 첫 실행에는 워커 프로세스 기동 시간이 포함되므로 warm-up 후 측정한다.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import List
+from app.utils import pdf_parser
+
+MODES = ["serial", "process"]
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pdf_paths(domains: List[str]) -> List[str]:
+    paths = []
+    for domain in domains:
+        data_dir = os.path.join(BASE_DIR, "scripts", domain, "data")
+        paths += [os.path.join(data_dir, f) for f in sorted(os.listdir(data_dir)) if f.lower().endswith(".pdf")]
+    return paths
+
+
+def run_mode(mode: str, paths: List[str], repeat: int):
+    timings = []
+    pages = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = pdf_parser.load_pdf_pages(paths, mode=mode)
+        timings.append(time.perf_counter() - start)
+    return timings, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF parsing throughput benchmark")
+    parser.add_argument("--domains", nargs="+", default=["course", "department_intro"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = pdf_paths(args.domains)
+    # 워커 프로세스 기동 (측정에서 제외)
+    pdf_parser.load_pdf_pages(paths[:1], mode="process")
+
+    print(f"\n📊 {len(paths)} PDFs, repeat={args.repeat}, workers={pdf_parser.PDF_PARSE_WORKERS}, "
+          f"pages_per_task={pdf_parser.PDF_PAGES_PER_TASK}\n")
+
+    results = {}
+    baseline = None
+    print(f"{'mode':<8} {'mean(s)':>8} {'min(s)':>8} {'pages':>6} {'pages/s':>8} {'speedup':>8}")
+    for mode in MODES:
+        timings, pages = run_mode(mode, paths, args.repeat)
+        results[mode] = pages
+        mean = statistics.mean(timings)
+        baseline = baseline or mean
+        total_pages = sum(len(p) for p in pages)
+        print(f"{mode:<8} {mean:>8.2f} {min(timings):>8.2f} {total_pages:>6} {total_pages / mean:>8.1f} {baseline / mean:>7.1f}x")
+
+    identical = results["serial"] == results["process"]
+    print(f"\n{'✅' if identical else '❌'} serial / process 결과 {'일치' if identical else '불일치'}")
+
+
+if __name__ == "__main__":
+    main()
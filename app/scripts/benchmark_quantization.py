@@ -0,0 +1,179 @@
+"""
+벡터 차원 축소 / 양자화 설정별 recall@k · 메모리 · 지연시간 비교 (임베딩 API 호출 없음)
+
+    python -m app.scripts.benchmark_quantization --queries 200 -k 5
+    python -m app.scripts.benchmark_quantization --dims 3072,1024,256 --quantization none,binary --on-disk
+    python -m app.scripts.benchmark_quantization --points 20000 --json report.json   # 컬렉션이 비어 있을 때 합성 벡터
+
+현재 컬렉션에 적재된 원본 벡터를 읽어 일부를 질의로 떼어 두고, 나머지를 설정마다 별도 벤치마크 컬렉션에 적재한다.
+- 차원 축소: text-embedding-3는 앞쪽 차원만 잘라 정규화한 벡터가 dimensions 옵션 결과와 같으므로 잘라서 재현
+- 정답: 전체 차원 벡터로 numpy 완전 탐색한 top-k (현재 운영 설정의 이상적인 결과)
+- 메모리: point당 원본 벡터 + 양자화 벡터 크기로 계산한 추정치 (HNSW 그래프 제외)
+양자화 설정은 원본 벡터 재채점(rescore) 유무를 모두 측정한다.
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+import numpy as np
+from qdrant_client import models
+from app.vectorstore import qdrant
+
+UPLOAD_BATCH_SIZE = 256
+
+
+def load_vectors(limit: int) -> np.ndarray:
+    vectors = []
+    offset = None
+    while len(vectors) < limit:
+        records, offset = qdrant.client.scroll(
+            collection_name=qdrant.COLLECTION_NAME,
+            limit=min(1000, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=True
+        )
+        vectors += [record.vector for record in records]
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def synthetic_vectors(count: int, dim: int, rng: np.random.Generator, clusters: int = 200) -> np.ndarray:
+    # 무작위 가우시안 벡터는 이웃 구조가 없어 recall 비교가 무의미하므로 군집 형태로 생성
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def estimated_memory(points: int, dim: int, quantization: str, on_disk: bool) -> Dict[str, float]:
+    original = points * dim * 4
+    quantized = {"none": 0, "scalar": points * dim, "binary": points * ((dim + 7) // 8)}[quantization]
+    mib = 1024 * 1024
+    return {"ram_mib": ((0 if on_disk else original) + quantized) / mib, "disk_mib": (original + quantized) / mib}
+
+
+def populate(collection: str, vectors: np.ndarray, quantization: str, on_disk: bool):
+    client = qdrant.client
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(
+        collection_name=collection,
+        vectors_config=qdrant._vectors_config(size=vectors.shape[1], on_disk=on_disk),
+        quantization_config=qdrant._quantization_config(quantization),
+        # 작은 코퍼스에서도 HNSW 인덱스와 양자화 벡터가 만들어지도록 임계값을 낮춤
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1)
+    )
+    for start in range(0, len(vectors), UPLOAD_BATCH_SIZE):
+        batch = vectors[start:start + UPLOAD_BATCH_SIZE]
+        client.upsert(
+            collection_name=collection,
+            points=models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+            wait=True
+        )
+
+
+def wait_until_indexed(collection: str, timeout: float = 600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if qdrant.client.get_collection(collection).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def measure(collection: str, queries: np.ndarray, truth: List[set], k: int, params: models.SearchParams) -> Dict[str, float]:
+    timings = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        response = qdrant.client.query_points(
+            collection_name=collection, query=query.tolist(), search_params=params, limit=k, with_payload=False
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(expected & {point.id for point in response.points}) / k)
+    timings.sort()
+    return {
+        "recall": statistics.mean(recalls),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="quantization / reduced-dimension recall benchmark")
+    parser.add_argument("--dims", default="3072,1536,1024,512,256")
+    parser.add_argument("--quantization", default="none,scalar,binary")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--oversampling", type=float, default=qdrant.QDRANT_OVERSAMPLING)
+    parser.add_argument("--on-disk", action="store_true", help="원본 벡터를 디스크에 저장")
+    parser.add_argument("--max-points", type=int, default=100000, help="컬렉션에서 읽을 최대 point 수")
+    parser.add_argument("--points", type=int, default=20000, help="컬렉션이 비어 있을 때 만들 합성 벡터 수")
+    parser.add_argument("--json", default="", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--keep", action="store_true", help="측정 후 벤치마크 컬렉션을 지우지 않음")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    source = "collection"
+    vectors = load_vectors(args.max_points) if qdrant.client.collection_exists(qdrant.COLLECTION_NAME) else np.empty((0, 0))
+    if len(vectors) <= args.queries:
+        source = "synthetic"
+        vectors = synthetic_vectors(args.points + args.queries, qdrant.VECTOR_SIZE, rng)
+    vectors = vectors[rng.permutation(len(vectors))]
+    query_vectors, corpus = vectors[:args.queries], vectors[args.queries:]
+    truth = exact_top_k(normalize(corpus), normalize(query_vectors), args.k)
+
+    dims = [d for d in (int(v) for v in args.dims.split(",")) if d <= corpus.shape[1]]
+    modes = [m.strip() for m in args.quantization.split(",")]
+    collection = f"{qdrant.COLLECTION_NAME}_quant_bench"
+    print(f"\n📊 {len(corpus)} points ({source}, dim={corpus.shape[1]}), queries={args.queries}, k={args.k}, on_disk={args.on_disk}\n")
+
+    rows = []
+    try:
+        for dim in dims:
+            reduced_corpus = normalize(corpus[:, :dim])
+            reduced_queries = normalize(query_vectors[:, :dim])
+            for mode in modes:
+                populate(collection, reduced_corpus, mode, args.on_disk)
+                wait_until_indexed(collection)
+                variants = {"-": None} if mode == "none" else {
+                    rescore: models.SearchParams(quantization=models.QuantizationSearchParams(
+                        rescore=rescore == "yes", oversampling=args.oversampling
+                    ))
+                    for rescore in ("yes", "no")
+                }
+                for rescore, params in variants.items():
+                    result = measure(collection, reduced_queries, truth, args.k, params)
+                    rows.append({
+                        "dim": dim, "quantization": mode, "rescore": rescore,
+                        **result, **estimated_memory(len(corpus), dim, mode, args.on_disk)
+                    })
+    finally:
+        if not args.keep and qdrant.client.collection_exists(collection):
+            qdrant.client.delete_collection(collection)
+
+    print(f"{'dim':>5} {'quant':<7} {'rescore':<7} {f'recall@{args.k}':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'RAM(MiB)':>9} {'disk(MiB)':>9}")
+    for row in rows:
+        print(
+            f"{row['dim']:>5} {row['quantization']:<7} {row['rescore']:<7} {row['recall']:>9.3f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['ram_mib']:>9.1f} {row['disk_mib']:>9.1f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "points": len(corpus), "k": args.k, "on_disk": args.on_disk, "results": rows}, f, indent=2)
+        print(f"\n💾 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
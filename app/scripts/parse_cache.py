@@ -0,0 +1,60 @@
+"""
+Upstage parse 캐시 관리
+
+    python -m app.scripts.parse_cache warm     # curriculum PDF를 Upstage로 파싱해 캐시를 채움 (UPSTAGE_API_KEY 필요)
+    python -m app.scripts.parse_cache verify [--remove-invalid]
+    python -m app.scripts.parse_cache stats
+    python -m app.scripts.parse_cache prune
+
+CI처럼 네트워크가 없는 환경에서는 warm으로 채운 캐시 디렉터리를 UPSTAGE_PARSE_CACHE_DIR로 지정하고
+UPSTAGE_PARSE_CACHE_OFFLINE=1로 실행하면 CurriculumIngestor가 Upstage 호출 없이 청크를 만든다.
+"""
+import argparse
+import json
+import os
+from app.domains.curriculum.ingestor import CurriculumIngestor
+from app.utils.parse_cache import parse_cache, file_sha256
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "curriculum", "data")
+
+
+def warm():
+    ingestor = CurriculumIngestor()
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(DATA_DIR, filename)
+        cached = parse_cache.get(file_sha256(path)) is not None
+        pages = parse_cache.load_pages(path, ingestor._parse_with_upstage)
+        print(f"{'✅ cached ' if cached else '📥 parsed '} {filename} ({len(pages)} pages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upstage parse cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("warm")
+    verify_parser = sub.add_parser("verify")
+    verify_parser.add_argument("--remove-invalid", action="store_true")
+    sub.add_parser("stats")
+    sub.add_parser("prune")
+    args = parser.parse_args()
+
+    print(f"📁 {parse_cache.cache_dir}")
+    if args.command == "warm":
+        warm()
+    elif args.command == "verify":
+        report = parse_cache.verify(remove_invalid=args.remove_invalid)
+        print(f"valid: {len(report['valid'])}, invalid: {len(report['invalid'])}")
+        for pdf_sha in report["invalid"]:
+            print(f"  ❌ {pdf_sha}{' (removed)' if args.remove_invalid else ''}")
+        if report["invalid"] and not args.remove_invalid:
+            raise SystemExit(1)
+    elif args.command == "stats":
+        print(json.dumps(parse_cache.stats(), indent=2))
+    elif args.command == "prune":
+        removed = parse_cache.prune()
+        print(f"removed {len(removed)} entries")
+
+
+if __name__ == "__main__":
+    main()
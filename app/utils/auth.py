@@ -1,36 +1,134 @@
-from fastapi import Request, HTTPException, status, Depends
-from passlib.context import CryptContext
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
+from sqlalchemy import event, select
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from app.config.database import AsyncSessionLocal
 from app.domains.user.model import User
+from app.domains.user.schema import AuthenticatedUser
+from app.utils.password_hasher import create_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = create_context()
 
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+# session id claim이 없는 (이전에 발급된) 토큰용 사용자 캐시
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "300"))
+
 bearer_scheme = HTTPBearer(auto_error=False)
 
+
+class UserCache:
+    """
+    user_id → AuthenticatedUser TTL + LRU 캐시. User 행이 수정되면 해당 항목을 무효화한다.
+    삭제된 user_id는 이미 발급된 토큰이 만료될 때까지 revoked로 남겨 sid claim 토큰도 거부한다.
+    (프로세스 단위 캐시이므로 다른 워커 프로세스에서 삭제된 사용자는 알지 못한다)
+    """
+
+    def __init__(
+        self,
+        max_size: int = AUTH_USER_CACHE_SIZE,
+        ttl_seconds: float = AUTH_USER_CACHE_TTL_SECONDS,
+        revoked_ttl_seconds: float = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    ):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._revoked_ttl_seconds = revoked_ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._revoked: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: AuthenticatedUser) -> None:
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self._ttl_seconds)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._revoked.pop(user_id, None)
+
+    def revoke(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._revoked[user_id] = time.monotonic() + self._revoked_ttl_seconds
+            self._revoked.move_to_end(user_id)
+            while len(self._revoked) > self._max_size:
+                self._revoked.popitem(last=False)
+
+    def is_revoked(self, user_id: int) -> bool:
+        with self._lock:
+            expires_at = self._revoked.get(user_id)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._revoked[user_id]
+                return False
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _revoke_deleted_user(mapper, connection, target):
+    user_cache.revoke(target.id)
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_jwt_token(user_id: int) -> str:
+def create_jwt_token(user_id: int, session_id: Optional[str] = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"sub": str(user_id), "exp": expire}
+    if session_id:
+        # 서명된 claim으로 session id를 담아 요청마다 DB를 조회하지 않도록 함
+        to_encode["sid"] = session_id
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+async def _load_user(user_id: int) -> Optional[AuthenticatedUser]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.id, User.bedrock_session_id).where(User.id == user_id))
+        row = result.first()
+        return AuthenticatedUser(id=row.id, bedrock_session_id=row.bedrock_session_id) if row else None
+
+async def get_current_user(request: Request) -> AuthenticatedUser:
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="⚠ 인증 토큰이 필요합니다.")
@@ -42,8 +140,17 @@ def get_current_user(
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="⚠ 유효하지 않은 토큰입니다.")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
+    if user_cache.is_revoked(user_id):
         raise HTTPException(status_code=404, detail="❌ 유저를 찾을 수 없습니다.")
-    return user
\ No newline at end of file
+
+    session_id = payload.get("sid")
+    if session_id:
+        return AuthenticatedUser(id=user_id, bedrock_session_id=session_id)
+
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await _load_user(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="❌ 유저를 찾을 수 없습니다.")
+        user_cache.put(user)
+    return user
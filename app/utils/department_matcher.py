@@ -0,0 +1,182 @@
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+import os
+import re
+
+# 기존 프롬프트의 학과 리스트 순서를 유지
+DEFAULT_DEPARTMENTS = ["소프트웨어학과", "디지털미디어학과", "국방디지털융합학과", "인공지능융합학과", "사이버보안학과"]
+
+# 학과를 확정할 수 있는 별칭 (공백 제거, 소문자 기준)
+STRONG_ALIASES: Dict[str, List[str]] = {
+    "소프트웨어학과": ["소프트웨어과", "소프트웨어전공", "소웨", "소웨과", "sw학과", "sw전공"],
+    "디지털미디어학과": ["디지털미디어", "디지털미디어과", "디지털미디어전공", "디미과", "디미", "미디어학과"],
+    "국방디지털융합학과": ["국방디지털융합", "국방디지털융합과", "국방디지털학과", "국디융", "국방학과"],
+    "인공지능융합학과": ["인공지능융합", "인공지능융합과", "인공지능학과", "ai융합학과", "ai학과", "인지융"],
+    "사이버보안학과": ["사이버보안", "사이버보안과", "사이버보안전공", "사이버학과", "보안학과", "사보과"],
+}
+
+# 학과명일 수도, 일반 주제어일 수도 있는 별칭 → 단독으로 나오면 LLM 판단에 맡김
+WEAK_ALIASES: Dict[str, List[str]] = {
+    "소프트웨어학과": ["소프트웨어", "sw"],
+    "디지털미디어학과": ["미디어"],
+    "국방디지털융합학과": ["국방", "국방디지털"],
+    "인공지능융합학과": ["인공지능", "ai"],
+    "사이버보안학과": ["보안", "사이버"],
+}
+
+# "OO학과" 형태지만 특정 학과를 가리키지 않는 표현
+GENERIC_PREFIXES = {
+    "", "무슨", "어느", "어떤", "우리", "다른", "타", "해당", "이", "그", "저", "모든", "각", "전체", "본", "소속", "몇개", "몇개의", "여러",
+}
+
+# 챗봇이 다루지 않는 아주대학교의 다른 학과 → 질문의 "OO학과" 표현이 이 이름과 같을 때만 not_supported로 확정
+OTHER_DEPARTMENTS = [
+    "기계공학과", "환경안전공학과", "산업공학과", "화학공학과", "첨단신소재공학과", "응용화학생명공학과",
+    "건설시스템공학과", "교통시스템공학과", "건축학과", "융합시스템공학과",
+    "전자공학과", "지능형반도체공학과", "미래모빌리티공학과",
+    "수학과", "물리학과", "화학과", "생명과학과",
+    "경영학과", "금융공학과", "경영인텔리전스학과",
+    "국어국문학과", "영어영문학과", "불어불문학과", "사학과", "문화콘텐츠학과",
+    "경제학과", "행정학과", "심리학과", "사회학과", "정치외교학과", "스포츠레저학과",
+    "의학과", "간호학과", "약학과", "자유전공학부", "국제학부",
+]
+
+# "학과목", "학부모"처럼 학과/학부가 아닌 단어의 일부는 제외
+_UNIT_PATTERN = re.compile(r"([가-힣A-Za-z]*)(학과(?!목)|학부(?!모))")
+
+
+def _load_ingested_departments() -> set:
+    """scripts/{domain}/data 아래 적재 대상 파일명(=학과명)을 수집"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    scripts_dir = os.path.join(base_dir, "scripts")
+    names = set()
+    if os.path.isdir(scripts_dir):
+        for domain in os.listdir(scripts_dir):
+            data_dir = os.path.join(scripts_dir, domain, "data")
+            if not os.path.isdir(data_dir):
+                continue
+            for filename in os.listdir(data_dir):
+                name = os.path.splitext(filename)[0]
+                if name.endswith(("학과", "학부")):
+                    names.add(name)
+    return names
+
+
+SUPPORTED_DEPARTMENTS: List[str] = DEFAULT_DEPARTMENTS + sorted(_load_ingested_departments() - set(DEFAULT_DEPARTMENTS))
+
+
+class DepartmentMatch(BaseModel):
+    result: str  # "valid", "not_supported", "not_specific", "ambiguous"(→ LLM 판단 필요)
+    departments: List[str] = []
+
+
+class _AliasTrie:
+    def __init__(self):
+        self._root: Dict = {}
+
+    def add(self, alias: str, department: str, strong: bool):
+        node = self._root
+        for ch in alias:
+            node = node.setdefault(ch, {})
+        # 같은 별칭이 여러 번 등록되면 strong 쪽을 우선
+        if node.get("$") is None or strong:
+            node["$"] = (department, strong)
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str, bool]]:
+        """왼쪽부터 가장 긴 별칭을 겹치지 않게 찾아 (start, end, department, strong) 리스트로 반환"""
+        matches = []
+        i = 0
+        while i < len(text):
+            node = self._root
+            longest: Optional[Tuple[int, str, bool]] = None
+            j = i
+            while j < len(text) and text[j] in node:
+                node = node[text[j]]
+                j += 1
+                if "$" in node:
+                    longest = (j, *node["$"])
+            if longest:
+                end, department, strong = longest
+                matches.append((i, end, department, strong))
+                i = end
+            else:
+                i += 1
+        return matches
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _strong_aliases(department: str) -> List[str]:
+    aliases = STRONG_ALIASES.get(department)
+    if aliases is None:
+        # 별칭 표에 없는 신규 학과는 학과명에서 기본 별칭을 만든다
+        base = department[:-2]
+        aliases = [base + "과", base + "전공"] if len(base) >= 3 else []
+    return aliases
+
+
+def _build_trie() -> _AliasTrie:
+    trie = _AliasTrie()
+    for department in SUPPORTED_DEPARTMENTS:
+        trie.add(_normalize(department), department, strong=True)
+        for alias in _strong_aliases(department):
+            trie.add(_normalize(alias), department, strong=True)
+        base = department[:-2]
+        for alias in WEAK_ALIASES.get(department, [base] if len(base) >= 2 else []):
+            trie.add(_normalize(alias), department, strong=False)
+    return trie
+
+
+_trie = _build_trie()
+# "OO학과/학부" 표현 전체가 이 이름과 같을 때만 지원 학과로 확정
+_KNOWN_UNITS = {
+    _normalize(name)
+    for department in SUPPORTED_DEPARTMENTS
+    for name in [department, *_strong_aliases(department)]
+}
+_UNSUPPORTED_UNITS = {_normalize(name) for name in OTHER_DEPARTMENTS} - _KNOWN_UNITS
+
+
+def match_departments(question: str, multiple: bool = True) -> DepartmentMatch:
+    """
+    질문에서 학과를 찾아 extract_department와 같은 result로 분류
+    multiple=False이면 단일 학과 상태용으로, 두 개 이상의 학과가 나오면 ambiguous를 반환
+    """
+    matches = _trie.find_all(_normalize(question))
+    strong = list(dict.fromkeys(department for _, _, department, is_strong in matches if is_strong))
+    weak = [department for _, _, department, is_strong in matches if not is_strong]
+
+    unknown = []
+    partial = False
+    for unit in _UNIT_PATTERN.finditer(question):
+        prefix = unit.group(1)
+        if prefix.lower() in GENERIC_PREFIXES:
+            continue
+        name = _normalize(unit.group(0))
+        if name in _KNOWN_UNITS:
+            continue
+        if name in _UNSUPPORTED_UNITS:
+            unknown.append(unit.group(0))
+            continue
+        # "정보보안학과"처럼 별칭을 포함하거나, "이산수학과 자료구조"처럼 조사 '과'로 이어진 명사일 수 있는 표현
+        partial = True
+
+    if partial:
+        return DepartmentMatch(result="ambiguous")
+
+    if unknown:
+        if strong:
+            return DepartmentMatch(result="ambiguous")
+        return DepartmentMatch(result="not_supported", departments=list(dict.fromkeys(unknown)))
+
+    if strong:
+        if not multiple and len(strong) > 1:
+            return DepartmentMatch(result="ambiguous")
+        return DepartmentMatch(result="valid", departments=strong)
+
+    if weak:
+        return DepartmentMatch(result="ambiguous")
+
+    return DepartmentMatch(result="not_specific")
@@ -0,0 +1,87 @@
+from typing import List
+from pydantic import BaseModel, Field
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_core.language_models import BaseChatModel
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# "concurrent": 문서별 평가를 동시에 실행 / "single_call": 한 번의 호출로 전체 문서 평가 / "serial": 기존 순차 평가
+GRADING_MODE = os.getenv("DOCUMENT_GRADING_MODE", "concurrent")
+GRADING_MAX_CONCURRENCY = int(os.getenv("DOCUMENT_GRADING_MAX_CONCURRENCY", "5"))
+
+
+class DocumentGrade(BaseModel):
+    id: int = Field(description="Document id given in the [Document id] header")
+    binary_score: str = Field(description="Document is relevant to the question, 'yes' or 'no'")
+
+class DocumentGrades(BaseModel):
+    """Binary relevance scores for every retrieved document."""
+
+    grades: List[DocumentGrade] = Field(description="One grade per document id")
+
+
+async def grade_documents_batch(
+    retrieval_grader: Runnable,
+    llm: BaseChatModel,
+    system: str,
+    question: str,
+    documents: List[str],
+) -> List[str]:
+    """
+    documents와 같은 순서의 'yes'/'no' 리스트를 반환
+    retrieval_grader는 문서 1건을 평가하는 도메인별 체인, system은 그 체인의 평가 기준 프롬프트
+    """
+    if not documents:
+        return []
+
+    if GRADING_MODE == "single_call":
+        scores = await _grade_in_single_call(llm, system, question, documents)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            # 응답에서 빠진 문서만 개별 평가로 보완
+            logger.warning(f"[GRADE] single_call 응답에 누락된 문서 {len(missing)}건 → 개별 평가")
+            retried = await _grade_concurrently(retrieval_grader, question, [documents[i] for i in missing])
+            for i, score in zip(missing, retried):
+                scores[i] = score
+        return scores
+
+    if GRADING_MODE == "serial":
+        scores = []
+        for doc in documents:
+            result = await retrieval_grader.ainvoke({"question": question, "document": doc})
+            scores.append(result.binary_score)
+        return scores
+
+    return await _grade_concurrently(retrieval_grader, question, documents)
+
+
+async def _grade_concurrently(retrieval_grader: Runnable, question: str, documents: List[str]) -> List[str]:
+    results = await retrieval_grader.abatch(
+        [{"question": question, "document": doc} for doc in documents],
+        config={"max_concurrency": GRADING_MAX_CONCURRENCY},
+    )
+    return [result.binary_score for result in results]
+
+
+async def _grade_in_single_call(llm: BaseChatModel, system: str, question: str, documents: List[str]) -> List:
+    grade_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", system + "\n\nYou will receive several documents, each starting with a [Document id] header. "
+                                "Grade every document independently and return one grade per document id."),
+            ("human", "User question: {question}\n\n Retrieved documents:\n\n {documents}"),
+        ]
+    )
+    chain = grade_prompt | llm.with_structured_output(DocumentGrades)
+
+    numbered = "\n\n".join(f"[Document {i}]\n{doc}" for i, doc in enumerate(documents))
+    result = await chain.ainvoke({"question": question, "documents": numbered})
+
+    scores = [None] * len(documents)
+    for grade in result.grades:
+        if 0 <= grade.id < len(documents):
+            scores[grade.id] = grade.binary_score
+    return scores
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# 요청 범위(document_scope) 밖에서 그래프를 실행할 때 쓰는 공용 캐시 크기
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "512"))
+# 문서 참조 id 접두사: Qdrant point id가 없는 청크(과목 색인 등)는 본문 해시로 식별
+CONTENT_ID_PREFIX = "sha1:"
+
+
+class DocumentCache:
+    """문서 참조 id → 검색 결과(hit) 캐시. max_size가 None이면 크기 제한 없음 (요청 범위용)"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self._hits: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def get(self, document_id: str) -> Optional[Dict]:
+        hit = self._hits.get(document_id)
+        if hit is not None:
+            self._hits.move_to_end(document_id)
+        return hit
+
+    def put(self, document_id: str, hit: Dict) -> None:
+        self._hits[document_id] = hit
+        self._hits.move_to_end(document_id)
+        if self.max_size is not None:
+            while len(self._hits) > self.max_size:
+                self._hits.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+
+_request_cache: ContextVar[Optional[DocumentCache]] = ContextVar("document_cache", default=None)
+_shared_cache = DocumentCache(DOCUMENT_CACHE_SIZE)
+
+
+@contextmanager
+def document_scope() -> Iterator[DocumentCache]:
+    """
+    한 번의 chat 요청 동안 검색한 문서 본문을 보관
+    그래프 노드는 요청 task의 context를 복사해 실행되므로 같은 캐시 객체를 공유한다.
+    """
+    cache = DocumentCache()
+    token = _request_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        try:
+            _request_cache.reset(token)
+        except ValueError:
+            # 스트리밍 응답이 끊겨 generator가 다른 context에서 정리되는 경우
+            _request_cache.set(None)
+
+
+def _current_cache() -> DocumentCache:
+    cache = _request_cache.get()
+    return cache if cache is not None else _shared_cache
+
+
+def document_id(hit: Dict) -> str:
+    if hit.get("id") is not None:
+        return str(hit["id"])
+    return CONTENT_ID_PREFIX + hashlib.sha1(hit.get("text", "").encode("utf-8")).hexdigest()
+
+
+def to_refs(hits: List[Dict]) -> List[Dict]:
+    """검색 결과를 캐시에 넣고 state에 담을 참조({"id", "score"}) 리스트를 반환"""
+    cache = _current_cache()
+    refs = []
+    for hit in hits:
+        ref_id = document_id(hit)
+        cache.put(ref_id, hit)
+        score = hit.get("score")
+        refs.append({"id": ref_id, "score": round(score, 4) if score is not None else None})
+    return refs
+
+
+async def resolve_documents(refs: List[Dict]) -> List[Dict]:
+    """
+    참조를 검색 결과(hit)로 되돌림
+    캐시에 없는 참조(다른 프로세스에서 이어받은 checkpoint 등)는 Qdrant에서 id로 다시 읽어온다.
+    """
+    cache = _current_cache()
+    resolved: Dict[str, Dict] = {}
+    missing = []
+    for ref in refs:
+        hit = cache.get(ref["id"])
+        if hit is not None:
+            resolved[ref["id"]] = hit
+        elif not ref["id"].startswith(CONTENT_ID_PREFIX):
+            missing.append(ref["id"])
+
+    if missing:
+        from app.vectorstore.qdrant import retrieve_points
+        for hit in await retrieve_points(missing):
+            cache.put(str(hit["id"]), hit)
+            resolved[str(hit["id"])] = hit
+
+    unresolved = [ref["id"] for ref in refs if ref["id"] not in resolved]
+    if unresolved:
+        logger.warning(f"[DOCUMENTS] {len(unresolved)} document refs could not be resolved: {unresolved}")
+    return [resolved[ref["id"]] for ref in refs if ref["id"] in resolved]
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Type, Union
+from pydantic import BaseModel, Field
+from app.domains.base_ingestor import BaseIngestor
+from app.vectorstore.qdrant import sync_documents
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# PDF 파싱/청킹 전용 스레드풀. FastAPI 기본 스레드풀을 점유하지 않아 채팅 요청이 밀리지 않는다.
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+# 메모리에 보관할 종료된 job 수
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "50"))
+
+# cancelling: 취소 요청을 받았지만 스레드풀의 파싱이 아직 끝나지 않음 (도메인 잠금 유지)
+ACTIVE_STATUSES = {"queued", "running", "cancelling"}
+CANCELLABLE_STATUSES = {"queued", "running"}
+
+
+class IngestionJobStatus(BaseModel):
+    job_id: str
+    domain: str
+    status: str  # queued, running, cancelling, succeeded, failed, cancelled
+    stage: Optional[str] = None  # parse, embed, finalize
+    progress: Dict[str, int] = Field(default_factory=lambda: {"done": 0, "total": 0})
+    timings: Dict[str, float] = Field(default_factory=dict)
+    result: Optional[Dict[str, Union[int, float]]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IngestionJobManager:
+    """
+    /data/embed 적재 작업을 백그라운드 job으로 실행
+    - 도메인별로 동시에 하나의 job만 실행
+    - 파싱/청킹은 전용 스레드풀, 임베딩/upsert는 이벤트 루프에서 비동기로 실행
+    """
+
+    def __init__(self, workers: int = INGEST_JOB_WORKERS, history: int = INGEST_JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._history = history
+        self._jobs: "OrderedDict[str, IngestionJobStatus]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._active_by_domain: Dict[str, str] = {}
+
+    def submit(
+        self,
+        domain: str,
+        ingestor_cls: Type[BaseIngestor],
+        on_complete: Optional[Callable[[Dict[str, float]], None]] = None
+    ) -> IngestionJobStatus:
+        """job을 등록하고 바로 반환. 같은 도메인의 job이 실행 중이면 ValueError"""
+        running = self.active_job(domain)
+        if running is not None:
+            raise ValueError(running)
+
+        job = IngestionJobStatus(job_id=uuid.uuid4().hex, domain=domain, status="queued", created_at=_now())
+        self._jobs[job.job_id] = job
+        self._active_by_domain[domain] = job.job_id
+        task = asyncio.create_task(self._run(job, ingestor_cls, on_complete))
+        task.add_done_callback(lambda _: self._release(job))
+        self._tasks[job.job_id] = task
+        self._trim_history()
+        return job
+
+    def active_job(self, domain: str) -> Optional[str]:
+        return self._active_by_domain.get(domain)
+
+    def get(self, job_id: str) -> Optional[IngestionJobStatus]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJobStatus]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[IngestionJobStatus]:
+        job = self._jobs.get(job_id)
+        task = self._tasks.get(job_id)
+        if job is not None and task is not None and job.status in CANCELLABLE_STATUSES:
+            job.status = "cancelling"
+            task.cancel()
+        return job
+
+    async def _run(self, job: IngestionJobStatus, ingestor_cls: Type[BaseIngestor], on_complete):
+        loop = asyncio.get_running_loop()
+        parse_future: Optional[asyncio.Future] = None
+        job.status = "running"
+        job.started_at = _now()
+
+        def progress(done: int, total: int):
+            job.progress = {"done": done, "total": total}
+
+        try:
+            job.stage = "parse"
+            ingestor = ingestor_cls()
+            start = time.perf_counter()
+            parse_future = loop.run_in_executor(self._executor, ingestor.ingest, f"scripts/{job.domain}/data")
+            # 취소돼도 스레드 작업의 완료 여부를 추적할 수 있도록 future 자체는 취소하지 않음
+            docs = await asyncio.shield(parse_future)
+            parse_seconds = ingestor.timings.get("parse", 0.0)
+            job.timings["parse"] = round(parse_seconds, 2)
+            job.timings["chunk"] = round(time.perf_counter() - start - parse_seconds, 2)
+
+            job.stage = "embed"
+            job.progress = {"done": 0, "total": 0}
+            start = time.perf_counter()
+            result = await sync_documents(job.domain, docs, progress=progress)
+            job.timings["embed"] = result["embed_seconds"]
+            job.timings["upsert"] = result["upsert_seconds"]
+            job.timings["sync"] = round(time.perf_counter() - start, 2)
+
+            job.stage = "finalize"
+            ingestor.on_synced(docs)
+            if on_complete:
+                on_complete(result)
+            job.result = result
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            if parse_future is not None and not parse_future.done():
+                # 스레드에서 실행 중인 ingest는 중단할 수 없으므로 끝날 때까지 도메인 잠금을 유지
+                job.status = "cancelling"
+                logger.info(f"[INGEST] job {job.job_id} ({job.domain}) waiting for parse to stop")
+                await asyncio.gather(parse_future, return_exceptions=True)
+            # 이미 upsert된 청크는 결정적 ID라 다음 실행에서 유지 처리됨
+            job.status = "cancelled"
+            logger.info(f"[INGEST] job {job.job_id} ({job.domain}) cancelled during {job.stage}")
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            logger.exception(f"[INGEST] job {job.job_id} ({job.domain}) failed")
+        finally:
+            job.finished_at = _now()
+            job.timings["total"] = round((job.finished_at - job.started_at).total_seconds(), 2)
+
+    def _release(self, job: IngestionJobStatus):
+        """task가 끝난 뒤(시작 전에 취소된 경우 포함) 도메인 잠금 해제"""
+        if job.status == "cancelling":
+            job.status = "cancelled"
+            job.finished_at = _now()
+        self._tasks.pop(job.job_id, None)
+        if self._active_by_domain.get(job.domain) == job.job_id:
+            del self._active_by_domain[job.domain]
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(self._jobs) - self._history)]:
+            del self._jobs[job_id]
+
+
+job_manager = IngestionJobManager()
@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UPSTAGE_PARSE_CACHE_DIR = os.getenv("UPSTAGE_PARSE_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "upstage_parse"))
+UPSTAGE_PARSE_CACHE_MAX_MB = float(os.getenv("UPSTAGE_PARSE_CACHE_MAX_MB", "512"))
+# 1이면 캐시에 없는 PDF를 Upstage로 보내지 않고 에러 (CI 등 네트워크 없는 환경용)
+UPSTAGE_PARSE_CACHE_OFFLINE = os.getenv("UPSTAGE_PARSE_CACHE_OFFLINE", "0") == "1"
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ParseCacheMiss(RuntimeError):
+    pass
+
+
+class UpstageParseCache:
+    """
+    Upstage Document Parse 결과(페이지별 HTML)를 PDF sha256 기준으로 저장하는 디스크 캐시
+
+    {cache_dir}/{sha[:2]}/{sha}/page-0000.html ...
+    {cache_dir}/{sha[:2]}/{sha}/manifest.json   (source_file, num_pages, 페이지별 sha256)
+    """
+
+    def __init__(self, cache_dir: str = UPSTAGE_PARSE_CACHE_DIR, max_mb: float = UPSTAGE_PARSE_CACHE_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _entry_dir(self, pdf_sha: str) -> str:
+        return os.path.join(self.cache_dir, pdf_sha[:2], pdf_sha)
+
+    def _entries(self) -> List[str]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, prefix, pdf_sha)
+            for prefix in sorted(os.listdir(self.cache_dir))
+            if os.path.isdir(os.path.join(self.cache_dir, prefix))
+            for pdf_sha in sorted(os.listdir(os.path.join(self.cache_dir, prefix)))
+        ]
+
+    def get(self, pdf_sha: str) -> Optional[List[str]]:
+        entry = self._entry_dir(pdf_sha)
+        manifest_path = os.path.join(entry, MANIFEST_FILE)
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            pages = []
+            for page_num in range(manifest["num_pages"]):
+                with open(os.path.join(entry, f"page-{page_num:04d}.html"), encoding="utf-8") as f:
+                    pages.append(f.read())
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._misses += 1
+            return None
+
+        # 최근 사용 시각을 manifest mtime으로 기록 (용량 초과 시 오래된 것부터 제거)
+        os.utime(manifest_path)
+        with self._lock:
+            self._hits += 1
+        return pages
+
+    def put(self, pdf_sha: str, pages: List[str], source_file: str = "") -> None:
+        entry = self._entry_dir(pdf_sha)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # 임시 디렉터리에 다 쓴 뒤 교체해 중간에 실패해도 반쯤 쓰인 항목이 남지 않도록 함
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(entry), prefix=".tmp-")
+        try:
+            for page_num, html in enumerate(pages):
+                with open(os.path.join(tmp_dir, f"page-{page_num:04d}.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+            manifest = {
+                "pdf_sha256": pdf_sha,
+                "source_file": source_file,
+                "num_pages": len(pages),
+                "page_sha256": [_text_sha256(html) for html in pages],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.prune()
+
+    def load_pages(self, path: str, parse: Callable[[str], List[str]]) -> List[str]:
+        """캐시에 있으면 저장된 페이지 HTML을, 없으면 parse(path) 결과를 저장 후 반환"""
+        pdf_sha = file_sha256(path)
+        pages = self.get(pdf_sha)
+        if pages is not None:
+            return pages
+        if UPSTAGE_PARSE_CACHE_OFFLINE:
+            raise ParseCacheMiss(f"{os.path.basename(path)} ({pdf_sha}) is not in the parse cache")
+        pages = parse(path)
+        self.put(pdf_sha, pages, source_file=os.path.basename(path))
+        return pages
+
+    def _entry_size(self, entry: str) -> int:
+        return sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+
+    def prune(self) -> List[str]:
+        """전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제"""
+        entries = []
+        for entry in self._entries():
+            manifest_path = os.path.join(entry, MANIFEST_FILE)
+            last_used = os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else 0.0
+            entries.append((last_used, entry, self._entry_size(entry)))
+
+        total = sum(size for _, _, size in entries)
+        removed = []
+        for _, entry, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed.append(os.path.basename(entry))
+        return removed
+
+    def verify(self, remove_invalid: bool = False) -> Dict[str, List[str]]:
+        """manifest와 페이지 파일의 sha256을 대조해 손상된 항목을 찾음"""
+        report = {"valid": [], "invalid": []}
+        for entry in self._entries():
+            pdf_sha = os.path.basename(entry)
+            try:
+                with open(os.path.join(entry, MANIFEST_FILE), encoding="utf-8") as f:
+                    manifest = json.load(f)
+                ok = manifest["pdf_sha256"] == pdf_sha and len(manifest["page_sha256"]) == manifest["num_pages"]
+                for page_num, expected in enumerate(manifest["page_sha256"]):
+                    if not ok:
+                        break
+                    with open(os.path.join(entry, f"page-{page_num:04d}.html"), encoding="utf-8") as f:
+                        ok = _text_sha256(f.read()) == expected
+            except (OSError, ValueError, KeyError):
+                ok = False
+
+            report["valid" if ok else "invalid"].append(pdf_sha)
+            if not ok and remove_invalid:
+                shutil.rmtree(entry, ignore_errors=True)
+        return report
+
+    def stats(self) -> Dict[str, float]:
+        entries = self._entries()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(entries),
+                "bytes": sum(self._entry_size(entry) for entry in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+parse_cache = UpstageParseCache()
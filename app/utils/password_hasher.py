@@ -0,0 +1,125 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+# bcrypt cost. 바꾸면 다음 로그인 때 기존 해시를 새 cost로 다시 저장
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 해시 전용 프로세스 수 (채팅 요청을 처리하는 스레드풀 / 이벤트 루프와 CPU를 나눠 쓰도록 작게 유지)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, min(2, (os.cpu_count() or 1) // 2)))))
+# 워커가 모두 바쁠 때 대기할 수 있는 최대 요청 수. 넘으면 503으로 바로 거절
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+
+def create_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# 워커 프로세스별 CryptContext (rounds별로 한 번만 생성)
+_worker_contexts: Dict[int, CryptContext] = {}
+
+
+def _worker_context(rounds: int) -> CryptContext:
+    context = _worker_contexts.get(rounds)
+    if context is None:
+        context = _worker_contexts[rounds] = create_context(rounds)
+    return context
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _worker_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    # 해시의 cost가 현재 설정과 다르면 검증 성공 시 새 해시도 함께 반환
+    return _worker_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증을 전용 프로세스 풀에서 실행
+    동시에 처리 중(실행 + 대기)인 요청 수를 workers + max_queue로 제한하고 대기열 지표를 기록한다.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._seconds_total = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(status_code=503, detail="⚠ 로그인 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._seconds_total += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        verified, new_hash = await self._submit(_verify_and_update, password, hashed_password, self.rounds)
+        if new_hash:
+            with self._lock:
+                self._rehashed += 1
+        return verified, new_hash
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "max_queue": self.max_queue,
+                "max_in_flight": self._max_in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "rehashed": self._rehashed,
+                "avg_ms": round(self._seconds_total / self._completed * 1000, 2) if self._completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from langchain_community.document_loaders import PDFPlumberLoader
+from langchain_community.document_loaders.parsers.pdf import PDFPlumberParser
+from langchain_core.document_loaders import Blob
+import multiprocessing
+import os
+import threading
+import pymupdf
+
+# serial: 기존처럼 파일을 하나씩 PDFPlumberLoader로 파싱, process: 프로세스 풀에 파일/페이지 구간 단위로 분산
+PDF_PARSE_MODE = os.getenv("PDF_PARSE_MODE", "process")
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(min(os.cpu_count() or 1, 8))))
+# 큰 PDF는 이 페이지 수 단위로 나눠 여러 워커가 나눠 파싱
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 적재는 API 스레드풀에서 실행되므로 fork 대신 spawn으로 워커를 띄움
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _parse_page_range(task: Tuple[str, int, int]) -> List[str]:
+    """
+    워커 프로세스에서 PDF의 [start, end) 페이지를 PDFPlumberLoader와 같은 방식으로 추출
+    해당 페이지만 담은 PDF를 만들어 PDFPlumberLoader가 쓰는 PDFPlumberParser에 그대로 넘긴다.
+    """
+    path, start, end = task
+    with pymupdf.open(path) as source, pymupdf.open() as part:
+        part.insert_pdf(source, from_page=start, to_page=end - 1)
+        data = part.tobytes()
+    return [doc.page_content for doc in PDFPlumberParser().lazy_parse(Blob.from_data(data, path=path))]
+
+
+def _page_count(path: str) -> int:
+    with pymupdf.open(path) as pdf:
+        return pdf.page_count
+
+
+def load_pdf_pages(paths: List[str], mode: Optional[str] = None) -> List[List[str]]:
+    """
+    PDF 파일들의 페이지별 텍스트를 입력 순서대로 반환 (paths[i] → 페이지 텍스트 리스트)
+    process 모드에서도 결과 순서는 serial 모드와 같다.
+    """
+    mode = mode or PDF_PARSE_MODE
+    if mode == "serial" or PDF_PARSE_WORKERS <= 1:
+        return [[page.page_content for page in PDFPlumberLoader(path).load()] for path in paths]
+
+    tasks = []
+    owners = []
+    for file_index, path in enumerate(paths):
+        total = _page_count(path)
+        for start in range(0, total, PDF_PAGES_PER_TASK):
+            tasks.append((path, start, min(start + PDF_PAGES_PER_TASK, total)))
+            owners.append(file_index)
+
+    results: List[List[str]] = [[] for _ in paths]
+    # map은 제출 순서대로 결과를 돌려주므로 페이지 순서가 유지됨
+    for file_index, pages in zip(owners, _get_pool().map(_parse_page_range, tasks)):
+        results[file_index].extend(pages)
+    return results
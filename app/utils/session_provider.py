@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, Optional
+import asyncio
+import logging
+import os
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# bedrock: Bedrock Agent Runtime 세션 / local: 프로세스 안에서 만든 uuid (오프라인 테스트용)
+SESSION_PROVIDER = os.getenv("SESSION_PROVIDER", "bedrock").lower()
+# 미리 만들어 둘 세션 수 (0이면 가입 요청마다 생성)
+SESSION_POOL_SIZE = int(os.getenv("SESSION_POOL_SIZE", "8"))
+SESSION_POOL_REFILL_CONCURRENCY = int(os.getenv("SESSION_POOL_REFILL_CONCURRENCY", "2"))
+SESSION_POOL_RETRY_SECONDS = float(os.getenv("SESSION_POOL_RETRY_SECONDS", "5"))
+
+
+class SessionProvider(ABC):
+    """
+    가입한 사용자에게 배정할 대화 세션 id를 제공
+    미리 만든 세션을 pool에 보관하고, 꺼내 쓴 만큼 백그라운드에서 다시 채운다.
+    """
+
+    def __init__(self, pool_size: int = SESSION_POOL_SIZE, refill_concurrency: int = SESSION_POOL_REFILL_CONCURRENCY):
+        self.pool_size = pool_size
+        self.refill_concurrency = max(1, refill_concurrency)
+        self._pool: Deque[str] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+        self._created = 0
+        self._errors = 0
+
+    @abstractmethod
+    async def _create(self) -> str:
+        """원격(또는 로컬)에 세션을 새로 만들고 id를 반환"""
+
+    async def _discard(self, session_id: str) -> None:
+        """쓰지 않은 세션 정리 (종료 시 pool에 남은 세션)"""
+
+    async def _create_counted(self) -> str:
+        session_id = await self._create()
+        self._created += 1
+        return session_id
+
+    def start(self) -> None:
+        """pool 채우기를 백그라운드로 시작 (이벤트 루프 안에서 호출)"""
+        if self.pool_size <= 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        while len(self._pool) < self.pool_size:
+            missing = self.pool_size - len(self._pool)
+            results = await asyncio.gather(
+                *(self._create_counted() for _ in range(min(missing, self.refill_concurrency))),
+                return_exceptions=True
+            )
+            failed = False
+            for result in results:
+                if isinstance(result, BaseException):
+                    self._errors += 1
+                    failed = True
+                    logger.warning(f"[SESSION_POOL] create failed: {result}")
+                else:
+                    self._pool.append(result)
+            if failed:
+                # 원격 장애 시 요청 경로에서 직접 생성하도록 두고 잠시 후 다시 채움
+                await asyncio.sleep(SESSION_POOL_RETRY_SECONDS)
+
+    async def acquire(self) -> str:
+        if self._pool:
+            self._hits += 1
+            session_id = self._pool.popleft()
+        else:
+            self._misses += 1
+            session_id = await self._create_counted()
+        self.start()
+        return session_id
+
+    def release(self, session_id: str) -> None:
+        """배정하지 못한 세션(가입 실패 등)을 pool에 돌려놓음"""
+        if len(self._pool) < self.pool_size:
+            self._pool.appendleft(session_id)
+
+    async def close(self) -> None:
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+            self._refill_task = None
+        pooled, self._pool = list(self._pool), deque()
+        await asyncio.gather(*(self._discard(session_id) for session_id in pooled), return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "available": len(self._pool),
+            "pool_size": self.pool_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "created": self._created,
+            "errors": self._errors,
+        }
+
+
+class BedrockSessionProvider(SessionProvider):
+    """Bedrock Agent Runtime 세션. 클라이언트는 한 번만 만들고 boto3 호출은 스레드에서 실행"""
+
+    def __init__(self, region_name: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._region_name = region_name or os.getenv("AWS_REGION")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _session_client(self):
+        with self._client_lock:
+            if self._client is None:
+                from langgraph_checkpoint_aws.saver import BedrockSessionSaver
+                self._client = BedrockSessionSaver(region_name=self._region_name).session_client
+            return self._client
+
+    async def _create(self) -> str:
+        session = await asyncio.to_thread(lambda: self._session_client().create_session())
+        return session.session_id
+
+    async def _discard(self, session_id: str) -> None:
+        from langgraph_checkpoint_aws.models import DeleteSessionRequest, EndSessionRequest
+
+        def end_and_delete():
+            client = self._session_client()
+            client.end_session(EndSessionRequest(session_identifier=session_id))
+            client.delete_session(DeleteSessionRequest(session_identifier=session_id))
+
+        await asyncio.to_thread(end_and_delete)
+
+
+class LocalSessionProvider(SessionProvider):
+    """원격 호출 없이 uuid를 세션 id로 사용 (테스트 / 오프라인 실행용)"""
+
+    async def _create(self) -> str:
+        return str(uuid.uuid4())
+
+
+def create_session_provider(name: str = SESSION_PROVIDER) -> SessionProvider:
+    if name == "bedrock":
+        return BedrockSessionProvider()
+    if name == "local":
+        return LocalSessionProvider()
+    raise ValueError(f"Unsupported SESSION_PROVIDER: {name}")
+
+
+session_provider = create_session_provider()
@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+from langchain_core.embeddings import Embeddings
+import asyncio
+import hashlib
+import math
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-large"
+VECTOR_SIZE_BY_MODEL = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+# local: sentence-transformers 형식으로 저장(vendoring)한 모델 디렉터리
+LOCAL_EMBEDDING_MODEL_PATH = os.getenv("LOCAL_EMBEDDING_MODEL_PATH", os.path.join(BASE_DIR, "models", "embedding"))
+LOCAL_EMBEDDING_BACKEND = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch")  # torch / onnx
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", str(min(4, os.cpu_count() or 1))))
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+
+# hashing: 외부 호출 / 모델 파일 없이 같은 입력에 항상 같은 벡터를 내는 테스트용
+HASHING_EMBEDDING_SIZE = int(os.getenv("HASHING_EMBEDDING_SIZE", "256"))
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class EmbeddingProvider(NamedTuple):
+    embeddings: Embeddings
+    # 쿼리 임베딩 캐시 키와 로그에 쓰는 모델 식별자
+    model: str
+    size: int
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers 모델로 CPU에서 직접 임베딩 (HTTP 왕복 없음)
+    추론은 전용 스레드 하나에서 배치 단위로 실행하고, 연산 스레드 수는 LOCAL_EMBEDDING_THREADS로 제한한다.
+    """
+
+    def __init__(
+        self,
+        model_path: str = LOCAL_EMBEDDING_MODEL_PATH,
+        backend: str = LOCAL_EMBEDDING_BACKEND,
+        threads: int = LOCAL_EMBEDDING_THREADS,
+        batch_size: int = LOCAL_EMBEDDING_BATCH_SIZE,
+    ):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_PROVIDER=local requires `sentence-transformers` (and `onnxruntime` for the onnx backend)"
+            ) from e
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Local embedding model not found: {model_path} (set LOCAL_EMBEDDING_MODEL_PATH)")
+
+        kwargs = {}
+        if backend == "onnx":
+            # onnx 추론은 torch 스레드 설정을 따르지 않으므로 onnxruntime 세션 옵션으로 스레드 수 제한
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            session_options.inter_op_num_threads = 1
+            kwargs = {
+                "backend": backend,
+                "model_kwargs": {"provider": "CPUExecutionProvider", "session_options": session_options},
+            }
+        else:
+            torch.set_num_threads(threads)
+            if backend != "torch":
+                kwargs = {"backend": backend}
+        self._model = SentenceTransformer(model_path, device="cpu", local_files_only=True, **kwargs)
+        self._batch_size = batch_size
+        # 모델은 스레드 안전하지 않으므로 추론을 한 스레드로 직렬화
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-embed")
+        self.model = os.path.basename(os.path.normpath(model_path))
+        self.size = self._model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts, batch_size=self._batch_size, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._executor.submit(self._encode, texts).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._encode, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class HashingEmbeddings(Embeddings):
+    """단어 / 문자 3-gram을 signed feature hashing으로 고정 차원에 투영한 결정적 임베딩"""
+
+    def __init__(self, size: int = HASHING_EMBEDDING_SIZE):
+        self.size = size
+        self.model = f"hashing-{size}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{token}" for token in tokens]
+        for token in tokens:
+            padded = f"#{token}#"
+            features += [f"c:{padded[i:i + 3]}" for i in range(max(1, len(padded) - 2))]
+        return features
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.size] += 1.0 if value >> 63 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if not norm:
+            # 특징이 없는 입력(빈 문자열 등)도 cosine 거리가 정의되도록 고정 단위 벡터 사용
+            vector[0] = norm = 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+
+def create_provider(name: str, dimensions: int = 0) -> EmbeddingProvider:
+    """EMBEDDING_PROVIDER 값(openai / local / hashing)에 맞는 임베딩 구현과 벡터 크기"""
+    if name == "openai":
+        from langchain_community.embeddings.openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(
+            model=OPENAI_EMBEDDING_MODEL,
+            model_kwargs={"dimensions": dimensions} if dimensions else {}
+        )
+        return EmbeddingProvider(embeddings, OPENAI_EMBEDDING_MODEL, dimensions or VECTOR_SIZE_BY_MODEL[OPENAI_EMBEDDING_MODEL])
+    if name == "local":
+        embeddings = LocalEmbeddings()
+        return EmbeddingProvider(embeddings, embeddings.model, embeddings.size)
+    if name == "hashing":
+        embeddings = HashingEmbeddings(dimensions or HASHING_EMBEDDING_SIZE)
+        return EmbeddingProvider(embeddings, embeddings.model, embeddings.size)
+    raise ValueError(f"Unsupported EMBEDDING_PROVIDER: {name}")
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from app.vectorstore.embedding_providers import create_provider
+import asyncio
+import os
+import threading
+
+# 임베딩 구현: openai (기본) / local (CPU 추론) / hashing (테스트용, 외부 호출 없음)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+# openai: text-embedding-3의 dimensions 옵션, hashing: 벡터 차원 (0이면 기본값). 바꾸면 컬렉션을 새로 만들어 다시 적재해야 함
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+
+# 프로세스 전체에서 공유하는 임베딩 클라이언트
+embeddings, EMBEDDING_MODEL, EMBEDDING_SIZE = create_provider(EMBEDDING_PROVIDER, EMBEDDING_DIMENSIONS)
+
+
+class QueryEmbeddingCache:
+    """(model, text) → 쿼리 임베딩 LRU 캐시. 같은 질문이 동시에 들어오면 임베딩 요청은 한 번만 보낸다."""
+
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self._max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def get(self, key: Tuple[str, str]):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return vector
+
+    def put(self, key: Tuple[str, str], vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    async def aget_or_embed(self, key: Tuple[str, str], embed) -> List[float]:
+        vector = self.get(key)
+        if vector is not None:
+            return vector
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            with self._lock:
+                self._misses -= 1
+                self._coalesced += 1
+        else:
+            # 임베딩은 요청과 분리된 task로 실행: 먼저 요청한 쪽이 끊겨도(스트림 연결 종료 등) 대기 중인 요청은 결과를 받는다
+            pending = asyncio.get_running_loop().create_task(self._embed(key, embed))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda task: self._finish(key, task))
+        return await asyncio.shield(pending)
+
+    async def _embed(self, key: Tuple[str, str], embed) -> List[float]:
+        vector = await embed(key[1])
+        self.put(key, vector)
+        return vector
+
+    def _finish(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if not task.cancelled():
+            # 기다리던 요청이 모두 끊긴 경우 예외가 회수되지 않았다는 경고가 뜨지 않도록 처리
+            task.exception()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "entries": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": (self._hits + self._coalesced) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+async def aembed_query(text: str) -> List[float]:
+    return await query_embedding_cache.aget_or_embed((EMBEDDING_MODEL, text), embeddings.aembed_query)
+
+
+def embed_query(text: str) -> List[float]:
+    key = (EMBEDDING_MODEL, text)
+    vector = query_embedding_cache.get(key)
+    if vector is None:
+        vector = embeddings.embed_query(text)
+        query_embedding_cache.put(key, vector)
+    return vector
+
+
+def query_embedding_cache_stats() -> Dict[str, float]:
+    return query_embedding_cache.stats()
@@ -1,37 +1,450 @@
-from typing import List, Optional, Dict
-from langchain_community.vectorstores.qdrant import Qdrant
-from langchain_community.embeddings.openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient, models
+from typing import Callable, List, Optional, Dict
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+import openai
+from qdrant_client import QdrantClient, AsyncQdrantClient, models
 from qdrant_client.http.models import Distance, VectorParams, Filter, FieldCondition, MatchValue, FilterSelector 
 from langchain_core.documents import Document
+from app.vectorstore.embeddings import EMBEDDING_PROVIDER, EMBEDDING_SIZE, embeddings, aembed_query, embed_query, query_embedding_cache_stats
 
-COLLECTION_NAME = "ajou_documents"
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
 
-VECTOR_SIZE_BY_MODEL = {
-    "text-embedding-3-small": 1536,
-    "text-embedding-3-large": 3072, 
-}
+# provider마다 벡터 공간이 다르므로 openai 외 provider는 별도 컬렉션을 사용 (같은 차원이어도 섞이지 않도록)
+COLLECTION_NAME = "ajou_documents" if EMBEDDING_PROVIDER == "openai" else f"ajou_documents_{EMBEDDING_PROVIDER}"
+
+# 결정적 point ID 생성을 위한 네임스페이스
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, COLLECTION_NAME)
+
+# 청크 내용과 무관하게 실행마다 바뀌는 메타데이터 (해시에서 제외)
+VOLATILE_METADATA_KEYS = {"chunk_index", "image_url", "content_hash"}
+
+# 적재 파이프라인 설정
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("INGEST_EMBED_MAX_RETRIES", "6"))
+EMBED_BACKOFF_BASE_SECONDS = float(os.getenv("INGEST_EMBED_BACKOFF_BASE_SECONDS", "1.0"))
+EMBED_BACKOFF_MAX_SECONDS = float(os.getenv("INGEST_EMBED_BACKOFF_MAX_SECONDS", "60"))
+
+# true면 domain 인덱스를 tenant 인덱스로 만들어 도메인별로 데이터를 모아 저장 (Qdrant 1.11+)
+QDRANT_TENANT_INDEX = os.getenv("QDRANT_TENANT_INDEX", "false").lower() == "true"
+
+# 벡터 저장 방식: 양자화(none / scalar / binary), 원본 벡터 디스크 저장, 검색 시 원본 벡터로 재채점
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+QDRANT_QUANTIZATION_ALWAYS_RAM = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "true").lower() == "true"
+QDRANT_VECTORS_ON_DISK = os.getenv("QDRANT_VECTORS_ON_DISK", "false").lower() == "true"
+QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "true").lower() == "true"
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+
+# 컬렉션 벡터 크기는 선택한 임베딩 provider를 따름
+VECTOR_SIZE = EMBEDDING_SIZE
 
 client = QdrantClient(host="qdrant", port=6333)
+async_client = AsyncQdrantClient(host="qdrant", port=6333)
+
+# 모든 검색이 필터로 쓰는 payload 필드 → keyword 인덱스 (값: tenant 인덱스로 만들지 여부)
+PAYLOAD_INDEX_FIELDS = {
+    "metadata.domain": QDRANT_TENANT_INDEX,
+    "metadata.department": False,
+}
+
+# 컬렉션 생성/인덱스 확인은 프로세스당 한 번만 수행
+_collection_ready = False
+_bootstrap_lock = threading.Lock()
+_abootstrap_lock = asyncio.Lock()
+
+
+def _vectors_config(size: int = VECTOR_SIZE, on_disk: bool = QDRANT_VECTORS_ON_DISK) -> VectorParams:
+    return VectorParams(size=size, distance=Distance.COSINE, on_disk=on_disk or None)
+
+
+def _quantization_config(mode: str = QDRANT_QUANTIZATION, always_ram: bool = QDRANT_QUANTIZATION_ALWAYS_RAM):
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=always_ram)
+        )
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=always_ram))
+    if mode == "none":
+        return None
+    raise ValueError(f"Unsupported QDRANT_QUANTIZATION: {mode}")
+
+
+def _search_params(mode: str = QDRANT_QUANTIZATION) -> Optional[models.SearchParams]:
+    # 양자화 벡터로 후보를 oversampling만큼 넓게 찾은 뒤 원본 벡터로 다시 점수를 매김
+    if mode == "none":
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(rescore=QDRANT_RESCORE, oversampling=QDRANT_OVERSAMPLING)
+    )
+
+
+def _check_vector_size(info: models.CollectionInfo):
+    size = info.config.params.vectors.size
+    if size != VECTOR_SIZE:
+        raise RuntimeError(
+            f"Collection '{COLLECTION_NAME}' stores {size}-dim vectors but the '{EMBEDDING_PROVIDER}' embedding provider produces {VECTOR_SIZE}. "
+            "Delete the collection (or restore the setting) and re-run ingestion."
+        )
+
+
+def _storage_update(info: models.CollectionInfo) -> Optional[Dict]:
+    """
+    기존 컬렉션의 양자화 / on_disk 설정이 현재 설정과 다르면 update_collection 인자를 반환 (재적재 불필요)
+    설정이 같을 때 update를 보내면 세그먼트 재최적화가 다시 돌 수 있으므로 None
+    """
+    # 서버가 채워 돌려주는 기본값(encoding 등) 때문에 객체 비교 대신 종류 / always_ram만 비교
+    current = info.config.quantization_config
+    current_mode = "scalar" if isinstance(current, models.ScalarQuantization) else "binary" if isinstance(current, models.BinaryQuantization) else "none"
+    current_always_ram = bool(getattr(getattr(current, current_mode, None), "always_ram", False))
+    on_disk = bool(info.config.params.vectors.on_disk)
+    if (
+        current_mode == QDRANT_QUANTIZATION
+        and (current_mode == "none" or current_always_ram == QDRANT_QUANTIZATION_ALWAYS_RAM)
+        and on_disk == QDRANT_VECTORS_ON_DISK
+    ):
+        return None
+    return {
+        "vectors_config": {"": models.VectorParamsDiff(on_disk=QDRANT_VECTORS_ON_DISK)},
+        "quantization_config": _quantization_config() or models.Disabled.DISABLED,
+    }
+
+
+def _index_params(is_tenant: bool) -> models.KeywordIndexParams:
+    # is_tenant를 쓰지 않으면 필드를 보내지 않아 tenant 인덱스를 지원하지 않는 Qdrant 버전과도 호환
+    return models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True if is_tenant else None)
+
 
 def ensure_collection():
-    if not client.collection_exists(COLLECTION_NAME):
-        client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=VECTOR_SIZE_BY_MODEL["text-embedding-3-large"],
-                distance=Distance.COSINE
+    global _collection_ready
+    if _collection_ready:
+        return
+    with _bootstrap_lock:
+        if _collection_ready:
+            return
+        if not client.collection_exists(COLLECTION_NAME):
+            client.create_collection(
+                collection_name=COLLECTION_NAME,
+                vectors_config=_vectors_config(),
+                quantization_config=_quantization_config()
             )
+        else:
+            info = client.get_collection(COLLECTION_NAME)
+            _check_vector_size(info)
+            update = _storage_update(info)
+            if update:
+                logger.info(f"[QDRANT] updating vector storage: quantization={QDRANT_QUANTIZATION}, on_disk={QDRANT_VECTORS_ON_DISK}")
+                client.update_collection(COLLECTION_NAME, **update)
+        for field, is_tenant in PAYLOAD_INDEX_FIELDS.items():
+            client.create_payload_index(COLLECTION_NAME, field_name=field, field_schema=_index_params(is_tenant))
+        _collection_ready = True
+
+
+async def aensure_collection():
+    global _collection_ready
+    if _collection_ready:
+        return
+    async with _abootstrap_lock:
+        if _collection_ready:
+            return
+        if not await async_client.collection_exists(COLLECTION_NAME):
+            await async_client.create_collection(
+                collection_name=COLLECTION_NAME,
+                vectors_config=_vectors_config(),
+                quantization_config=_quantization_config()
+            )
+        else:
+            info = await async_client.get_collection(COLLECTION_NAME)
+            _check_vector_size(info)
+            update = _storage_update(info)
+            if update:
+                logger.info(f"[QDRANT] updating vector storage: quantization={QDRANT_QUANTIZATION}, on_disk={QDRANT_VECTORS_ON_DISK}")
+                await async_client.update_collection(COLLECTION_NAME, **update)
+        for field, is_tenant in PAYLOAD_INDEX_FIELDS.items():
+            await async_client.create_payload_index(COLLECTION_NAME, field_name=field, field_schema=_index_params(is_tenant))
+        _collection_ready = True
+
+
+def _to_hit(point: models.ScoredPoint) -> Dict:
+    # langchain Qdrant.add_documents가 저장한 payload 형식 (page_content / metadata)
+    payload = point.payload or {}
+    return {
+        "id": str(point.id),
+        "score": getattr(point, "score", None),
+        "text": payload.get("page_content", ""),
+        "metadata": payload.get("metadata") or {},
+    }
+
+
+def content_hash(domain: str, doc: Document) -> str:
+    """청크 본문과 안정적인 메타데이터로 계산한 해시"""
+    stable_metadata = {k: v for k, v in doc.metadata.items() if k not in VOLATILE_METADATA_KEYS}
+    raw = json.dumps(
+        {"domain": domain, "page_content": doc.page_content, "metadata": stable_metadata},
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _domain_filter(domain: str) -> Filter:
+    return Filter(must=[FieldCondition(key="metadata.domain", match=MatchValue(value=domain))])
+
+
+async def load_manifest(domain: str) -> Dict[str, Dict]:
+    """
+    도메인의 manifest(point_id → {content_hash, chunk_index})를 컬렉션에서 읽어옴
+    manifest를 컬렉션 payload에 두기 때문에 DELETE나 Qdrant 초기화 후에도 실제 적재 상태와 어긋나지 않는다.
+    """
+    manifest = {}
+    offset = None
+    while True:
+        records, offset = await async_client.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=_domain_filter(domain),
+            limit=1000,
+            offset=offset,
+            with_payload=["metadata.content_hash", "metadata.chunk_index"],
+            with_vectors=False
         )
-        
+        for record in records:
+            metadata = (record.payload or {}).get("metadata") or {}
+            manifest[str(record.id)] = {
+                "content_hash": metadata.get("content_hash"),
+                "chunk_index": metadata.get("chunk_index"),
+            }
+        if offset is None:
+            return manifest
 
-def add_documents(domain: str, docs: List[Document]):
-    ensure_collection()
+
+async def scroll_documents(domain: str) -> List[Document]:
+    """도메인에 적재된 청크 전체를 Document로 읽어옴 (벡터 제외)"""
+    docs = []
+    offset = None
+    while True:
+        records, offset = await async_client.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=_domain_filter(domain),
+            limit=1000,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        for record in records:
+            payload = record.payload or {}
+            docs.append(Document(page_content=payload.get("page_content", ""), metadata=payload.get("metadata") or {}))
+        if offset is None:
+            return docs
+
+
+async def retrieve_points(point_ids: List[str]) -> List[Dict]:
+    """point id로 청크를 다시 읽어옴 (state에는 id만 두고 본문은 필요할 때 조회)"""
+    await aensure_collection()
+    records = await async_client.retrieve(
+        collection_name=COLLECTION_NAME,
+        ids=point_ids,
+        with_payload=True,
+        with_vectors=False
+    )
+    return [_to_hit(record) for record in records]
+
+
+class _RateLimitGate:
+    """429를 받으면 모든 임베딩 워커가 함께 대기하도록 재개 시각을 공유"""
+
+    def __init__(self):
+        self._resume_at = 0.0
+
+    async def wait(self):
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return float(value) * scale
+        except ValueError:
+            continue
+    return None
+
+
+async def _aembed_with_backoff(texts: List[str], gate: _RateLimitGate) -> List[List[float]]:
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        await gate.wait()
+        try:
+            return await embeddings.aembed_documents(texts)
+        except RETRYABLE_ERRORS as e:
+            if attempt == EMBED_MAX_RETRIES:
+                raise
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = min(EMBED_BACKOFF_MAX_SECONDS, EMBED_BACKOFF_BASE_SECONDS * 2 ** attempt)
+                delay += random.uniform(0, delay / 2)
+            if isinstance(e, openai.RateLimitError):
+                gate.pause(delay)
+            logger.warning(f"[INGEST] embedding 실패 ({type(e).__name__}), {delay:.1f}s 후 재시도 ({attempt + 1}/{EMBED_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+
+async def aupsert_documents(
+    point_ids: List[str],
+    docs: List[Document],
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, float]:
+    """
+    임베딩 + upsert 파이프라인
+    - EMBED_BATCH_SIZE 단위로 나눠 최대 EMBED_CONCURRENCY개의 임베딩 요청을 동시에 보냄
+    - 임베딩이 끝난 batch는 큐를 통해 바로 upsert되어 다음 batch 임베딩과 겹쳐 실행됨
+    - progress(done, total)로 진행 상황을 전달
+    """
+    total = len(docs)
+    started = time.perf_counter()
+    # 단계별 누적 호출 시간 (embed는 동시 요청의 합이라 wall-clock보다 클 수 있음)
+    busy = {"embed": 0.0, "upsert": 0.0}
+    if total == 0:
+        return {"embedded": 0, "seconds": 0.0, "chunks_per_second": 0.0, "embed_seconds": 0.0, "upsert_seconds": 0.0}
+
+    batches = [
+        (point_ids[start:start + EMBED_BATCH_SIZE], docs[start:start + EMBED_BATCH_SIZE])
+        for start in range(0, total, EMBED_BATCH_SIZE)
+    ]
+    gate = _RateLimitGate()
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+    # 임베딩이 upsert보다 너무 앞서 나가 벡터가 메모리에 쌓이지 않도록 큐 크기를 제한
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EMBED_CONCURRENCY)
+
+    async def embed(batch_ids: List[str], batch_docs: List[Document]):
+        async with semaphore:
+            embed_start = time.perf_counter()
+            vectors = await _aembed_with_backoff([doc.page_content for doc in batch_docs], gate)
+            busy["embed"] += time.perf_counter() - embed_start
+        await queue.put((batch_ids, batch_docs, vectors))
+
+    async def upsert():
+        done = 0
+        for _ in batches:
+            batch_ids, batch_docs, vectors = await queue.get()
+            upsert_start = time.perf_counter()
+            await async_client.upsert(
+                collection_name=COLLECTION_NAME,
+                points=[
+                    models.PointStruct(
+                        id=point_id,
+                        vector=vector,
+                        payload={"page_content": doc.page_content, "metadata": doc.metadata}
+                    )
+                    for point_id, doc, vector in zip(batch_ids, batch_docs, vectors)
+                ]
+            )
+            busy["upsert"] += time.perf_counter() - upsert_start
+            done += len(batch_ids)
+            elapsed = time.perf_counter() - started
+            logger.info(f"[INGEST] {done}/{total} chunks ({done / elapsed:.1f} chunks/s)")
+            if progress:
+                progress(done, total)
+
+    tasks = [asyncio.create_task(embed(batch_ids, batch_docs)) for batch_ids, batch_docs in batches]
+    tasks.append(asyncio.create_task(upsert()))
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "embedded": total,
+        "seconds": round(elapsed, 2),
+        "chunks_per_second": round(total / elapsed, 1),
+        "embed_seconds": round(busy["embed"], 2),
+        "upsert_seconds": round(busy["upsert"], 2),
+    }
+
+
+async def sync_documents(
+    domain: str,
+    docs: List[Document],
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, float]:
+    """
+    content hash 기반 증분 적재
+    - 새로 생기거나 바뀐 청크만 임베딩 후 upsert
+    - 더 이상 존재하지 않는 청크(이전 버전, 무작위 ID로 적재된 기존 point 포함)는 삭제
+    """
+    await aensure_collection()
+    manifest = await load_manifest(domain)
+
+    desired: Dict[str, Document] = {}
+    occurrences: Dict[str, int] = {}
     for doc in docs:
         doc.metadata["domain"] = domain
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-    vectordb = Qdrant(client=client, collection_name=COLLECTION_NAME, embeddings=embeddings)
-    vectordb.add_documents(docs)
+        digest = content_hash(domain, doc)
+        # 같은 파일 안에 동일한 청크가 반복되면 등장 순서로 구분
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        doc.metadata["content_hash"] = digest
+        point_id = str(uuid.uuid5(POINT_ID_NAMESPACE, f"{domain}:{digest}:{occurrence}"))
+        desired[point_id] = doc
+
+    new_ids = [point_id for point_id in desired if point_id not in manifest]
+    stale_ids = [point_id for point_id in manifest if point_id not in desired]
+    unchanged_ids = [point_id for point_id in desired if point_id in manifest]
+
+    logger.info(f"[INGEST] {domain}: 추가 {len(new_ids)}, 유지 {len(unchanged_ids)}, 삭제 {len(stale_ids)}")
+    pipeline = await aupsert_documents(new_ids, [desired[point_id] for point_id in new_ids], progress)
+
+    # 내용은 같지만 앞쪽 청크가 바뀌어 순번만 밀린 경우 payload만 갱신
+    reindexed = [
+        models.SetPayloadOperation(
+            set_payload=models.SetPayload(
+                payload={"chunk_index": desired[point_id].metadata.get("chunk_index")},
+                points=[point_id],
+                key="metadata"
+            )
+        )
+        for point_id in unchanged_ids
+        if manifest[point_id]["chunk_index"] != desired[point_id].metadata.get("chunk_index")
+    ]
+    if reindexed:
+        await async_client.batch_update_points(collection_name=COLLECTION_NAME, update_operations=reindexed)
+
+    if stale_ids:
+        await async_client.delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=models.PointIdsList(points=stale_ids)
+        )
+
+    return {
+        "added": len(new_ids),
+        "unchanged": len(unchanged_ids),
+        "removed": len(stale_ids),
+        "seconds": pipeline["seconds"],
+        "chunks_per_second": pipeline["chunks_per_second"],
+        "embed_seconds": pipeline["embed_seconds"],
+        "upsert_seconds": pipeline["upsert_seconds"],
+    }
 
 
 def delete_documents(domain: str):
@@ -54,13 +467,13 @@ def delete_documents(domain: str):
     )
     
 
-def similarity_search(
+async def similarity_search(
     query: str,
     domain: str,
     k: int = 5,
     metadata_filters: Optional[Dict[str, str]] = None
 ) -> List[Dict]:
-    ensure_collection()
+    await aensure_collection()
 
     conditions = [FieldCondition(key="metadata.domain", match=MatchValue(value=domain))]
     if metadata_filters:
@@ -69,41 +482,58 @@ def similarity_search(
 
     filter = Filter(must=conditions)
 
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-    vectordb = Qdrant(
-        client=client,
+    query_vector = await aembed_query(query)
+
+    response = await async_client.query_points(
         collection_name=COLLECTION_NAME,
-        embeddings=embeddings
+        query=query_vector,
+        query_filter=filter,
+        search_params=_search_params(),
+        limit=k,
+        with_payload=True
     )
+    return [_to_hit(point) for point in response.points]
 
-    docs: List[Document] = vectordb.similarity_search(query=query, k=k, filter=filter)
-    return [{"text": doc.page_content, "metadata": doc.metadata} for doc in docs]
-
-def similarity_search_multiple_departments(
+async def similarity_search_multiple_departments(
     query: str,
     domain: str,
     departments: List[str],
     per_department_k: int = 3
 ) -> List[Dict]:
-    ensure_collection()
+    await aensure_collection()
 
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-    vectordb = Qdrant(
-        client=client,
-        collection_name=COLLECTION_NAME,
-        embeddings=embeddings
-    )
+    departments = list(dict.fromkeys(departments))
+    if not departments:
+        return []
 
-    all_results = []
+    # 쿼리는 한 번만 임베딩하고, 학과별 필터를 하나의 batch 요청으로 검색
+    query_vector = await aembed_query(query)
 
-    for dept in departments:
-        filter = Filter(
-            must=[
-                FieldCondition(key="metadata.domain", match=MatchValue(value=domain)),
-                FieldCondition(key="metadata.department", match=MatchValue(value=dept)),
-            ]
+    requests = [
+        models.QueryRequest(
+            query=query_vector,
+            filter=Filter(
+                must=[
+                    FieldCondition(key="metadata.domain", match=MatchValue(value=domain)),
+                    FieldCondition(key="metadata.department", match=MatchValue(value=dept)),
+                ]
+            ),
+            params=_search_params(),
+            limit=per_department_k,
+            with_payload=True
         )
-        docs: List[Document] = vectordb.similarity_search(query=query, k=per_department_k, filter=filter)
-        all_results.extend([{"text": doc.page_content, "metadata": doc.metadata} for doc in docs])
+        for dept in departments
+    ]
+    responses = await async_client.query_batch_points(collection_name=COLLECTION_NAME, requests=requests)
+
+    all_results = []
+    seen_ids = set()
+
+    for response in responses:
+        for point in response.points:
+            if point.id in seen_ids:
+                continue
+            seen_ids.add(point.id)
+            all_results.append(_to_hit(point))
 
     return all_results
@@ -2,9 +2,58 @@
 
 import streamlit as st
 import requests
+import json
 
 API_BASE = "http://fastapi-app:8000"
 
+NODE_LABELS = {
+    "query_filter": "질문을 확인하고 있습니다",
+    "route_query": "질문 유형을 분류하고 있습니다",
+    "gate": "질문을 확인하고 있습니다",
+    "extract_department": "학과 정보를 확인하고 있습니다",
+    "retrieve": "관련 문서를 검색하고 있습니다",
+    "grade_documents": "검색된 문서를 검토하고 있습니다",
+    "transform_query": "질문을 다시 정리하고 있습니다",
+    "generate": "답변을 작성하고 있습니다",
+}
+
+def iter_sse(res):
+    """text/event-stream 응답을 (event, data) 쌍으로 변환"""
+    event, data = None, []
+    for line in res.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data)) if data else {}
+            event, data = None, []
+
+def stream_answer(query: str, placeholder) -> str:
+    answer = ""
+    with requests.post(
+        f"{API_BASE}/chat/stream",
+        json={"query": query},
+        headers={"Authorization": f"Bearer {st.session_state.access_token}"},
+        stream=True
+    ) as res:
+        res.raise_for_status()
+        res.encoding = "utf-8"
+        for event, data in iter_sse(res):
+            if event == "node" and not answer:
+                label = NODE_LABELS.get(data.get("node"))
+                if label:
+                    placeholder.markdown(f"⏳ {label}...")
+            elif event == "token":
+                answer += data["content"]
+                placeholder.markdown(answer + "▌")
+            elif event == "retract":
+                answer = ""
+                placeholder.markdown("🔄 답변을 다시 검토하고 있습니다...")
+            elif event == "done":
+                answer = data["response"]
+    return answer
+
 def run():
     st.sidebar.title("🔐 로그인")
     email = st.sidebar.text_input("이메일")
@@ -40,17 +89,12 @@ def run():
         with st.chat_message("user"):
             st.markdown(query)
 
-        try:
-            res = requests.post(
-                f"{API_BASE}/chat/chat",
-                json={"query": query},
-                headers={"Authorization": f"Bearer {st.session_state.access_token}"}
-            )
-            res.raise_for_status()
-            answer = res.json()["response"]
-        except Exception as e:
-            answer = f"❌ 오류 발생: {str(e)}"
-
-        st.session_state.messages.append({"role": "assistant", "content": answer})
         with st.chat_message("assistant"):
-            st.markdown(answer)
\ No newline at end of file
+            placeholder = st.empty()
+            try:
+                answer = stream_answer(query, placeholder)
+            except Exception as e:
+                answer = f"❌ 오류 발생: {str(e)}"
+            placeholder.markdown(answer)
+
+        st.session_state.messages.append({"role": "assistant", "content": answer})
\ No newline at end of file